@@ -1,15 +1,38 @@
 """Load Neo4j connection configuration from environment variables.
 
-Replicates the .env loading pattern from repo_graph/cli.py (lines 12-24)
-without importing from that package, keeping the two packages decoupled.
+The .env file in the working directory is read once per process: every
+`KEY=value` line sets KEY unless it is already in the environment, and a
+key repeated in the file keeps its first value. The parser is local to this
+package (no python-dotenv, no import from repo_graph).
 """
 
 from __future__ import annotations
 
 import os
+import re
+import stat
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 
+# One `KEY=value` assignment per line, scanned over the whole file at once
+# with finditer(). The key is everything before the first '=' (as with
+# str.partition), so e.g. "export FOO=bar" sets "export FOO". Surrounding
+# blanks on both the key and the value are dropped by the pattern itself;
+# [ \t] rather than \s keeps a match from running across line breaks.
+# Comment and blank lines simply don't match.
+_ENV_LINE = re.compile(
+    r"^[ \t]*([^#=\s][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t\r]*$",
+    re.MULTILINE,
+)
+
+# One-shot guard: the .env file is applied to os.environ at most once per
+# process. The lock is only taken on the first (unloaded) call. This is the
+# only caching in this module; load_neo4j_config() itself always reads the
+# current environment.
+_DOTENV_LOADED = False
+_DOTENV_LOCK = threading.Lock()
+
 
 @dataclass(frozen=True)
 class Neo4jConfig:
@@ -19,27 +42,55 @@ class Neo4jConfig:
     username: str
     password: str
     database: str
+    max_connection_pool_size: int = 100
+    connection_acquisition_timeout: float = 60.0
 
 
 def _load_dotenv() -> None:
-    """Load .env file from cwd if it exists (no third-party dependency)."""
-    env_path = Path.cwd() / ".env"
-    if not env_path.is_file():
+    """Load .env file from cwd if it exists (no third-party dependency).
+
+    Runs at most once per process; later calls return immediately.
+    """
+    global _DOTENV_LOADED
+    if _DOTENV_LOADED:
+        return
+    with _DOTENV_LOCK:
+        if _DOTENV_LOADED:
+            return
+        _apply_dotenv(Path.cwd() / ".env")
+        _DOTENV_LOADED = True
+
+
+def _apply_dotenv(env_path: Path) -> None:
+    """Parse *env_path* and fill in variables not already set."""
+    # A single stat() covers missing, non-regular and empty files — the
+    # common case in containers where no .env is mounted.
+    try:
+        st = env_path.stat()
+    except FileNotFoundError:
+        return
+    if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
         return
-    for line in env_path.read_text().splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
+
+    text = env_path.read_bytes().decode("utf-8", "replace")
+    parsed: dict[str, str] = {}
+    for m in _ENV_LINE.finditer(text):
+        # A key repeated in the file keeps its first value.
+        parsed.setdefault(m.group(1), m.group(2))
+
+    # Variables injected by the environment (e.g. container secrets) win
+    # over .env; skip them before touching os.environ at all.
+    for key, value in parsed.items():
+        if key in os.environ:
             continue
-        key, _, value = line.partition("=")
-        key, value = key.strip(), value.strip()
-        if key and key not in os.environ:
-            os.environ[key] = value
+        os.environ[key] = value
 
 
 def load_neo4j_config() -> Neo4jConfig:
     """Read Neo4j connection details from environment variables.
 
-    Looks for NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DATABASE.
+    Looks for NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DATABASE,
+    plus the pool knobs NEO4J_MAX_POOL_SIZE and NEO4J_ACQ_TIMEOUT (seconds).
     Falls back to sensible defaults for local development.
     """
     _load_dotenv()
@@ -48,4 +99,8 @@ def load_neo4j_config() -> Neo4jConfig:
         username=os.environ.get("NEO4J_USERNAME", "neo4j"),
         password=os.environ.get("NEO4J_PASSWORD", "password"),
         database=os.environ.get("NEO4J_DATABASE", "neo4j"),
+        max_connection_pool_size=int(os.environ.get("NEO4J_MAX_POOL_SIZE", "100")),
+        connection_acquisition_timeout=float(
+            os.environ.get("NEO4J_ACQ_TIMEOUT", "60.0")
+        ),
     )
@@ -8,106 +8,399 @@ AsyncGraphDatabase natively, so we use it directly instead of wrapping
 sync calls in run_in_executor.
 
 This class is created once in the server lifespan and shared across all
-tool invocations via ctx.lifespan_context["db"].
+tool invocations via ctx.lifespan_context["db"]. get_client() / close_client()
+own that one process-wide instance; each client carries its own connection
+pool, so constructing more than one is almost always a mistake and is logged.
 """
 
 from __future__ import annotations
 
-import fnmatch
+import functools
+import logging
+import re
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from neo4j import AsyncGraphDatabase
+from neo4j import AsyncGraphDatabase, AsyncResult, AsyncSession, RoutingControl
+from neo4j.exceptions import Neo4jError
 
-from brocode_mcp.env import Neo4jConfig
+from brocode_mcp.env import Neo4jConfig, load_neo4j_config
 from brocode_mcp import queries
 
+logger = logging.getLogger(__name__)
+
+READ = RoutingControl.READ
+WRITE = RoutingControl.WRITE
+
+# Shapes a query's AsyncResult inside execute_query(); see Neo4jClient._execute.
+ResultTransformer = Callable[[AsyncResult], Awaitable[Any]]
+
 # Node types that can appear in the type_clause of QUERY_CODEBASE_TEMPLATE.
 # Used as an allowlist to prevent Cypher injection via string formatting.
-VALID_NODE_TYPES = {"File", "Directory", "Codebase", "Class", "Function"}
+VALID_NODE_TYPES: frozenset[str] = frozenset(
+    {"File", "Directory", "Codebase", "Class", "Function"}
+)
+_VALID_NODE_TYPES_DISPLAY = ", ".join(sorted(VALID_NODE_TYPES))
+# $node_types parameter for the queries that report a node's type label.
+_NODE_TYPES_PARAM = sorted(VALID_NODE_TYPES)
+
+# Rows per UNWIND write transaction for the *_batch methods. Keeps each
+# transaction's memory footprint bounded on large ingests.
+WRITE_BATCH_SIZE = 1000
+
+# Most messages an agent's inbox holds; SEND_MESSAGE drops the oldest ones
+# beyond this so an inbox that is never polled can't grow without bound.
+MAX_INBOX_SIZE = 1000
+
+# How long (seconds) a positive check_agent_exists() answer is reused.
+# Misses are never cached: an agent appears as soon as it claims a node.
+AGENT_EXISTS_TTL = 30.0
+# Most agents the check_agent_exists() cache holds at once.
+AGENT_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=256)
+def _glob_to_regex(pattern: str) -> str | None:
+    """Translate an fnmatch-style glob into a regex usable with Cypher's =~.
+
+    fnmatch.translate() emits Python-only syntax (named groups, \\Z) that the
+    Java regex engine behind =~ rejects, so the same rules are applied here
+    with portable constructs only: * -> .*, ? -> ., [seq] / [!seq] -> a
+    character class. =~ always matches the whole string, so no anchors.
+
+    Returns None for globs that match every path (e.g. "*"), so callers can
+    drop the filter instead of running a no-op regex over each row. Cached
+    per glob string: agents tend to repeat the same few filters.
+    """
+    parts: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "*":
+            # Collapse runs of '*' — they are equivalent to a single one.
+            if not parts or parts[-1] != ".*":
+                parts.append(".*")
+        elif c == "?":
+            parts.append(".")
+        elif c == "[":
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                # Unterminated class: treat '[' literally, like fnmatch.
+                parts.append("\\[")
+                continue
+            body = pattern[i:j]
+            i = j + 1
+            negate = body.startswith("!")
+            if negate:
+                body = body[1:]
+            body = _glob_class_body(body)
+            if not body:
+                # Only empty ranges: [z-a] never matches, [!z-a] matches
+                # any character — the same as fnmatch.
+                parts.append("." if negate else "(?!)")
+            else:
+                parts.append(f"[{'^' if negate else ''}{body}]")
+        else:
+            parts.append(re.escape(c))
+    if parts == [".*"]:
+        return None
+    return "(?s)" + "".join(parts)
+
+
+def _glob_class_body(body: str) -> str:
+    """Translate the inside of a glob [...] class for a Java character class.
+
+    Follows fnmatch.translate(): ranges whose end sorts before their start
+    (e.g. "z-a") match nothing and are dropped, because the Java engine
+    rejects them outright. A '-' that starts or ends the body is literal.
+    Everything the class syntax treats specially is escaped.
+    """
+    # Split on range hyphens: "a-cx-z" -> ["a", "cx", "z"]. A leading '-'
+    # is literal, and a hyphen right after a range end starts nothing.
+    chunks: list[str] = []
+    start, k = 0, 1
+    while True:
+        k = body.find("-", k)
+        if k < 0:
+            break
+        chunks.append(body[start:k])
+        start = k + 1
+        k += 3
+    if body[start:] or not chunks:
+        chunks.append(body[start:])
+    else:
+        chunks[-1] += "-"
+    # Drop empty ranges, merging the characters on either side of them.
+    for k in range(len(chunks) - 1, 0, -1):
+        if chunks[k - 1][-1] > chunks[k][0]:
+            chunks[k - 1] = chunks[k - 1][:-1] + chunks[k][1:]
+            del chunks[k]
+
+    def escape(chunk: str) -> str:
+        return "".join("\\" + ch if ch in "\\[]^&-" else ch for ch in chunk)
+
+    return "-".join(escape(chunk) for chunk in chunks)
+
+
+def _glob_prefix(pattern: str) -> str:
+    """Return the literal part of *pattern* before its first wildcard."""
+    for i, c in enumerate(pattern):
+        if c in "*?[":
+            return pattern[:i]
+    return pattern
+
+
+def _build_query_cypher(node_type: str | None, path_match: str | None) -> str:
+    """Format QUERY_CODEBASE_TEMPLATE for one (node_type, path_match) combination.
+
+    path_match is None (no path filter), "prefix" (STARTS WITH $path_prefix
+    only) or "glob" (STARTS WITH $path_prefix plus =~ $path_re).
+    """
+    type_clause = f":{node_type}" if node_type else ""
+
+    # Build WHERE clause based on whether we're filtering by type. With a
+    # concrete label, compare the indexed property directly so the planner
+    # can seek instead of scanning every node of that label.
+    if node_type == "Codebase":
+        where_clause = "n.name = $codebase"
+    elif node_type:
+        where_clause = "n.codebase = $codebase"
+    else:
+        where_clause = (
+            "((n:Codebase AND n.name = $codebase) OR (n.codebase = $codebase))"
+        )
+    if path_match:
+        # The STARTS WITH on the glob's literal prefix is implied by the
+        # regex, but unlike =~ it can be answered from the (codebase, path)
+        # range index for File and Directory. Globs that are just a prefix
+        # followed by '*' need nothing else.
+        path_expr = (
+            "n.path" if node_type in ("File", "Directory")
+            else "coalesce(n.path, n.name)"
+        )
+        where_clause += f" AND {path_expr} STARTS WITH $path_prefix"
+        if path_match == "glob":
+            where_clause += f" AND {path_expr} =~ $path_re"
+
+    return queries.QUERY_CODEBASE_TEMPLATE.format(
+        type_clause=type_clause,
+        where_clause=where_clause,
+    )
+
+
+# Every query_codebase Cypher variant, keyed by (node_type, path_match).
+# There are only eighteen, so all are built at import time; query_codebase
+# just looks one up, and warm_query_plans() can plan each once at startup.
+QUERY_CODEBASE_VARIANTS: dict[tuple[str | None, str | None], str] = {
+    (node_type, path_match): _build_query_cypher(node_type, path_match)
+    for node_type in (None, *sorted(VALID_NODE_TYPES))
+    for path_match in (None, "prefix", "glob")
+}
+
+
+async def _single_data(result: AsyncResult) -> dict | None:
+    """Result transformer: the only record as a dict, or None if empty."""
+    record = await result.single()
+    return record.data() if record else None
+
+
+# Every Neo4jClient that has not been closed or collected. Only used to warn
+# when a second driver (and with it a second connection pool) is created.
+_LIVE_CLIENTS: weakref.WeakSet[Neo4jClient] = weakref.WeakSet()
+
+# The process-wide client handed out by get_client().
+_CLIENT: Neo4jClient | None = None
 
 
 class Neo4jClient:
     """Thin async wrapper around the Neo4j async driver."""
 
     def __init__(self, config: Neo4jConfig) -> None:
+        if _LIVE_CLIENTS:
+            logger.warning(
+                "Creating another Neo4jClient while %d are still open; each "
+                "one holds its own connection pool. Use get_client() instead.",
+                len(_LIVE_CLIENTS),
+            )
         self._driver = AsyncGraphDatabase.driver(
-            config.uri, auth=(config.username, config.password)
+            config.uri,
+            auth=(config.username, config.password),
+            max_connection_pool_size=config.max_connection_pool_size,
+            connection_acquisition_timeout=config.connection_acquisition_timeout,
         )
         self._database = config.database
+        # agent_name -> (expires_at, agent info)
+        self._agent_cache: dict[str, tuple[float, dict]] = {}
+        _LIVE_CLIENTS.add(self)
 
     async def close(self) -> None:
+        _LIVE_CLIENTS.discard(self)
         await self._driver.close()
 
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Open a session that callers can reuse across many write calls.
+
+        The upsert_* / delete_* methods accept it via their ``session``
+        keyword, so a bulk update pays for one pool acquisition instead of
+        one per call:
+
+            async with db.session() as session:
+                await db.upsert_file(..., session=session)
+                await db.delete_file(..., session=session)
+
+        Sessions are not safe for concurrent use — don't share one across
+        tasks running in parallel.
+        """
+        async with self._driver.session(database=self._database) as session:
+            yield session
+
+    @asynccontextmanager
+    async def _session_or_new(
+        self, session: AsyncSession | None
+    ) -> AsyncIterator[AsyncSession]:
+        """Yield the caller's session if given, otherwise a fresh one."""
+        if session is not None:
+            yield session
+        else:
+            async with self.session() as new_session:
+                yield new_session
+
+    async def _execute(
+        self,
+        cypher: str,
+        routing: RoutingControl,
+        result_transformer: ResultTransformer = AsyncResult.data,
+        **params,
+    ):
+        """Run one query through driver.execute_query().
+
+        Used by every standalone query: the driver manages the session,
+        transaction, retries and bookmarks itself, and *result_transformer*
+        shapes the result before the connection goes back to the pool.
+        The upsert/delete helpers keep the explicit session path so callers
+        can share one session across a batch (see session()).
+        """
+        return await self._driver.execute_query(
+            cypher,
+            parameters_=params,
+            routing_=routing,
+            database_=self._database,
+            result_transformer_=result_transformer,
+        )
+
+    # ------------------------------------------------------------------
+    # schema
+    # ------------------------------------------------------------------
+
+    async def bootstrap_schema(self) -> None:
+        """Create the constraints and indexes the queries rely on.
+
+        Idempotent. One read lists the existing index names first, so a
+        database that is already set up costs a single round trip instead
+        of one schema write per statement. A statement the server rejects
+        (e.g. a uniqueness constraint over data that already has
+        duplicates) is logged and skipped so the remaining ones are still
+        created.
+        """
+        try:
+            record = await self._execute(
+                queries.SHOW_INDEX_NAMES, READ, _single_data
+            )
+            existing = set(record["names"]) if record else set()
+        except Neo4jError as exc:
+            # e.g. no privilege to list indexes: fall back to running all.
+            logger.debug("Could not list indexes (%s)", exc.code)
+            existing = set()
+
+        for name, statement in queries.SCHEMA_STATEMENTS.items():
+            if name in existing:
+                continue
+            try:
+                await self._execute(statement, WRITE, AsyncResult.consume)
+            except Neo4jError as exc:
+                logger.warning(
+                    "Schema statement failed (%s): %s", exc.code, statement
+                )
+
+    async def warm_query_plans(self) -> None:
+        """Execute every query_codebase variant once so its plan is cached.
+
+        Runs with LIMIT 0 against an empty codebase name, so nothing is
+        returned; the point is only to pay the planning cost at startup.
+        """
+        for cypher in QUERY_CODEBASE_VARIANTS.values():
+            await self._execute(
+                cypher, READ, AsyncResult.consume,
+                codebase="", limit=0, offset=0, path_re="", path_prefix="",
+                node_types=_NODE_TYPES_PARAM,
+            )
+
+    async def warm_page_cache(self) -> None:
+        """Read every codebase node and relationship once.
+
+        Pulls the store files into Neo4j's page cache so the first tool
+        calls after a cold start don't pay for the disk reads. Meant to run
+        in the background; the results themselves are discarded.
+        """
+        for cypher in (queries.WARM_NODES, queries.WARM_RELATIONSHIPS):
+            await self._execute(cypher, READ, AsyncResult.consume)
+
     # ------------------------------------------------------------------
     # claim_node helpers
     # ------------------------------------------------------------------
 
     async def check_node_exists(self, node_path: str, codebase: str) -> dict | None:
         """Return node info dict if the node exists, None otherwise."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_read(
-                self._run_check_node_exists, node_path, codebase
-            )
-
-    @staticmethod
-    async def _run_check_node_exists(tx, node_path: str, codebase: str) -> dict | None:
-        result = await tx.run(
-            queries.CHECK_NODE_EXISTS, node_path=node_path, codebase=codebase
+        return await self._execute(
+            queries.CHECK_NODE_EXISTS, READ, _single_data,
+            node_path=node_path, codebase=codebase,
         )
-        record = await result.single()
-        return dict(record) if record else None
 
     async def check_existing_claim(self, node_path: str, codebase: str) -> list[dict]:
         """Return list of agents that have claimed this node."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_read(
-                self._run_check_existing_claim, node_path, codebase
-            )
-
-    @staticmethod
-    async def _run_check_existing_claim(tx, node_path: str, codebase: str) -> list[dict]:
-        result = await tx.run(
-            queries.CHECK_EXISTING_CLAIM, node_path=node_path, codebase=codebase
+        return await self._execute(
+            queries.CHECK_EXISTING_CLAIM, READ,
+            node_path=node_path, codebase=codebase,
         )
-        return [dict(record) async for record in result]
 
-    async def create_claim(
+    async def claim_node(
         self,
         agent_name: str,
         agent_model: str,
         node_path: str,
         codebase: str,
         claim_reason: str,
-    ) -> dict | None:
-        """Create Agent node (MERGE) and CLAIM relationship. Returns node info."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_write(
-                self._run_create_claim,
-                agent_name,
-                agent_model,
-                node_path,
-                codebase,
-                claim_reason,
-            )
+    ) -> dict:
+        """Run the full claim flow in one write transaction.
 
-    @staticmethod
-    async def _run_create_claim(
-        tx,
-        agent_name: str,
-        agent_model: str,
-        node_path: str,
-        codebase: str,
-        claim_reason: str,
-    ) -> dict | None:
-        result = await tx.run(
-            queries.CREATE_CLAIM,
-            agent_name=agent_name,
-            agent_model=agent_model,
-            node_path=node_path,
-            codebase=codebase,
-            claim_reason=claim_reason,
-        )
-        record = await result.single()
-        return dict(record) if record else None
+        Returns a dict with "status" (not_found / claimed / already_yours /
+        conflict), the node's labels and path, and the pre-existing "claims".
+        """
+        results = await self.create_claims_batch([{
+            "agent_name": agent_name, "agent_model": agent_model,
+            "node_path": node_path, "codebase": codebase,
+            "claim_reason": claim_reason,
+        }])
+        return results[0]
+
+    async def create_claims_batch(self, items: list[dict]) -> list[dict]:
+        """Claim many nodes in a single write transaction.
+
+        Each item needs agent_name, agent_model, node_path, codebase and
+        claim_reason. Returns one claim_node()-style result per item, in
+        order, plus the item's node_path.
+        """
+        return await self._execute(queries.CLAIM_NODES, WRITE, items=items)
 
     # ------------------------------------------------------------------
     # release_node helpers
@@ -117,23 +410,19 @@ class Neo4jClient:
         self, agent_name: str, node_path: str, codebase: str
     ) -> dict | None:
         """Remove CLAIM relationship. Returns info if it existed, None otherwise."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_write(
-                self._run_release_claim, agent_name, node_path, codebase
-            )
+        released = await self.release_claims_batch([{
+            "agent_name": agent_name, "node_path": node_path,
+            "codebase": codebase,
+        }])
+        return released[0] if released else None
 
-    @staticmethod
-    async def _run_release_claim(
-        tx, agent_name: str, node_path: str, codebase: str
-    ) -> dict | None:
-        result = await tx.run(
-            queries.RELEASE_CLAIM,
-            agent_name=agent_name,
-            node_path=node_path,
-            codebase=codebase,
-        )
-        record = await result.single()
-        return dict(record) if record else None
+    async def release_claims_batch(self, items: list[dict]) -> list[dict]:
+        """Remove many CLAIM relationships in a single write transaction.
+
+        Each item needs agent_name, node_path and codebase. Returns info for
+        the claims that existed; items without a claim are left out.
+        """
+        return await self._execute(queries.RELEASE_CLAIMS, WRITE, items=items)
 
     # ------------------------------------------------------------------
     # graph update helpers (upsert / delete)
@@ -147,25 +436,22 @@ class Neo4jClient:
         extension: str,
         size_bytes: int,
         parent_path: str,
+        session: AsyncSession | None = None,
     ) -> None:
         """Upsert a File node and optionally link to parent Directory."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_upsert_file, codebase, path, name, extension,
-                size_bytes, parent_path,
-            )
+        await self.upsert_files_batch(codebase, [{
+            "path": path, "name": name, "extension": extension,
+            "size_bytes": size_bytes, "parent_path": parent_path,
+        }], session=session)
 
-    @staticmethod
-    async def _run_upsert_file(
-        tx, codebase: str, path: str, name: str, extension: str,
-        size_bytes: int, parent_path: str,
+    async def upsert_files_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
     ) -> None:
-        await tx.run(
-            queries.UPSERT_FILE,
-            codebase=codebase, path=path, name=name,
-            extension=extension, size_bytes=size_bytes,
-            parent_path=parent_path,
-        )
+        """Upsert many File nodes with one UNWIND query per batch.
+
+        Each row needs path, name, extension, size_bytes and parent_path.
+        """
+        await self._write_batches(queries.UPSERT_FILES, codebase, rows, session)
 
     async def upsert_directory(
         self,
@@ -174,24 +460,23 @@ class Neo4jClient:
         name: str,
         depth: int,
         parent_path: str,
+        session: AsyncSession | None = None,
     ) -> None:
         """Upsert a Directory node and optionally link to parent Directory."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_upsert_directory, codebase, path, name, depth,
-                parent_path,
-            )
+        await self.upsert_directories_batch(codebase, [{
+            "path": path, "name": name, "depth": depth,
+            "parent_path": parent_path,
+        }], session=session)
 
-    @staticmethod
-    async def _run_upsert_directory(
-        tx, codebase: str, path: str, name: str, depth: int,
-        parent_path: str,
+    async def upsert_directories_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
     ) -> None:
-        await tx.run(
-            queries.UPSERT_DIRECTORY,
-            codebase=codebase, path=path, name=name,
-            depth=depth, parent_path=parent_path,
-        )
+        """Upsert many Directory nodes with one UNWIND query per batch.
+
+        Each row needs path, name, depth and parent_path. Parents must come
+        before their children (in this or an earlier batch) to be linked.
+        """
+        await self._write_batches(queries.UPSERT_DIRECTORIES, codebase, rows, session)
 
     async def upsert_function(
         self,
@@ -202,25 +487,24 @@ class Neo4jClient:
         is_method: bool,
         parameters: str,
         owner_class: str,
+        session: AsyncSession | None = None,
     ) -> None:
         """Upsert a Function node and link to parent File."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_upsert_function, codebase, file_path, name,
-                line_number, is_method, parameters, owner_class,
-            )
-
-    @staticmethod
-    async def _run_upsert_function(
-        tx, codebase: str, file_path: str, name: str, line_number: int,
-        is_method: bool, parameters: str, owner_class: str,
+        await self.upsert_functions_batch(codebase, [{
+            "file_path": file_path, "name": name, "line_number": line_number,
+            "is_method": is_method, "parameters": parameters,
+            "owner_class": owner_class,
+        }], session=session)
+
+    async def upsert_functions_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
     ) -> None:
-        await tx.run(
-            queries.UPSERT_FUNCTION,
-            codebase=codebase, file_path=file_path, name=name,
-            line_number=line_number, is_method=is_method,
-            parameters=parameters, owner_class=owner_class,
-        )
+        """Upsert many Function nodes with one UNWIND query per batch.
+
+        Each row needs file_path, name, line_number, is_method, parameters
+        and owner_class.
+        """
+        await self._write_batches(queries.UPSERT_FUNCTIONS, codebase, rows, session)
 
     async def upsert_class(
         self,
@@ -229,103 +513,135 @@ class Neo4jClient:
         name: str,
         line_number: int,
         base_classes: str,
+        session: AsyncSession | None = None,
     ) -> None:
         """Upsert a Class node and link to parent File."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_upsert_class, codebase, file_path, name,
-                line_number, base_classes,
-            )
+        await self.upsert_classes_batch(codebase, [{
+            "file_path": file_path, "name": name, "line_number": line_number,
+            "base_classes": base_classes,
+        }], session=session)
+
+    async def upsert_classes_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
+    ) -> None:
+        """Upsert many Class nodes with one UNWIND query per batch.
+
+        Each row needs file_path, name, line_number and base_classes.
+        """
+        await self._write_batches(queries.UPSERT_CLASSES, codebase, rows, session)
+
+    async def _write_batches(
+        self,
+        cypher: str,
+        codebase: str,
+        rows: list[dict],
+        session: AsyncSession | None = None,
+    ) -> None:
+        """Run an UNWIND query over *rows*, one write transaction per batch."""
+        async with self._session_or_new(session) as session:
+            for start in range(0, len(rows), WRITE_BATCH_SIZE):
+                await session.execute_write(
+                    self._run_unwind, cypher, codebase,
+                    rows[start:start + WRITE_BATCH_SIZE],
+                )
 
     @staticmethod
-    async def _run_upsert_class(
-        tx, codebase: str, file_path: str, name: str, line_number: int,
-        base_classes: str,
+    async def _run_unwind(tx, cypher: str, codebase: str, rows: list[dict]) -> None:
+        result = await tx.run(cypher, codebase=codebase, rows=rows)
+        await result.consume()
+
+    async def delete_file(
+        self, path: str, codebase: str,
+        session: AsyncSession | None = None,
     ) -> None:
-        await tx.run(
-            queries.UPSERT_CLASS,
-            codebase=codebase, file_path=file_path, name=name,
-            line_number=line_number, base_classes=base_classes,
+        """Delete a File node and its AST children."""
+        await self.delete_files_batch(
+            codebase, [{"path": path}], session=session
         )
 
-    async def delete_file(self, path: str, codebase: str) -> None:
-        """Delete a File node and its AST children."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_delete_file, path, codebase,
-            )
+    async def delete_files_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
+    ) -> None:
+        """Delete many File nodes (and their AST children) per UNWIND batch.
 
-    @staticmethod
-    async def _run_delete_file(tx, path: str, codebase: str) -> None:
-        await tx.run(queries.DELETE_FILE, path=path, codebase=codebase)
+        Each row needs path.
+        """
+        await self._write_batches(queries.DELETE_FILES, codebase, rows, session)
 
-    async def delete_directory(self, path: str, codebase: str) -> None:
+    async def delete_directory(
+        self, path: str, codebase: str,
+        session: AsyncSession | None = None,
+    ) -> None:
         """Delete a Directory node and all descendants."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_delete_directory, path, codebase,
-            )
+        await self.delete_directories_batch(
+            codebase, [{"path": path}], session=session
+        )
 
-    @staticmethod
-    async def _run_delete_directory(tx, path: str, codebase: str) -> None:
-        await tx.run(queries.DELETE_DIRECTORY, path=path, codebase=codebase)
+    async def delete_directories_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
+    ) -> None:
+        """Delete many Directory nodes (and all descendants) per UNWIND batch.
 
-    async def delete_function(self, file_path: str, name: str, codebase: str) -> None:
-        """Delete a specific Function node."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_delete_function, file_path, name, codebase,
-            )
+        Each row needs path.
+        """
+        await self._write_batches(
+            queries.DELETE_DIRECTORIES, codebase, rows, session
+        )
 
-    @staticmethod
-    async def _run_delete_function(
-        tx, file_path: str, name: str, codebase: str
+    async def delete_function(
+        self, file_path: str, name: str, codebase: str,
+        session: AsyncSession | None = None,
     ) -> None:
-        await tx.run(
-            queries.DELETE_FUNCTION,
-            file_path=file_path, name=name, codebase=codebase,
+        """Delete a specific Function node."""
+        await self.delete_functions_batch(
+            codebase, [{"file_path": file_path, "name": name}], session=session
         )
 
-    async def delete_class(self, file_path: str, name: str, codebase: str) -> None:
-        """Delete a Class node and its methods."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_delete_class, file_path, name, codebase,
-            )
+    async def delete_functions_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
+    ) -> None:
+        """Delete many Function nodes per UNWIND batch.
 
-    @staticmethod
-    async def _run_delete_class(
-        tx, file_path: str, name: str, codebase: str
+        Each row needs file_path and name.
+        """
+        await self._write_batches(queries.DELETE_FUNCTIONS, codebase, rows, session)
+
+    async def delete_class(
+        self, file_path: str, name: str, codebase: str,
+        session: AsyncSession | None = None,
     ) -> None:
-        await tx.run(
-            queries.DELETE_CLASS,
-            file_path=file_path, name=name, codebase=codebase,
+        """Delete a Class node and its methods."""
+        await self.delete_classes_batch(
+            codebase, [{"file_path": file_path, "name": name}], session=session
         )
 
+    async def delete_classes_batch(
+        self, codebase: str, rows: list[dict], session: AsyncSession | None = None
+    ) -> None:
+        """Delete many Class nodes (and their methods) per UNWIND batch.
+
+        Each row needs file_path and name.
+        """
+        await self._write_batches(queries.DELETE_CLASSES, codebase, rows, session)
+
     # ------------------------------------------------------------------
     # get_active_agents helpers
     # ------------------------------------------------------------------
 
     async def get_active_agents(self, codebase: str | None = None) -> list[dict]:
-        """Return all active CLAIM relationships, optionally filtered by codebase."""
-        async with self._driver.session(database=self._database) as session:
-            if codebase:
-                return await session.execute_read(
-                    self._run_get_agents_by_codebase, codebase
-                )
-            return await session.execute_read(self._run_get_agents_all)
-
-    @staticmethod
-    async def _run_get_agents_all(tx) -> list[dict]:
-        result = await tx.run(queries.GET_ACTIVE_AGENTS_ALL)
-        return [dict(record) async for record in result]
+        """Return active claims grouped per agent, optionally filtered by codebase.
 
-    @staticmethod
-    async def _run_get_agents_by_codebase(tx, codebase: str) -> list[dict]:
-        result = await tx.run(
-            queries.GET_ACTIVE_AGENTS_BY_CODEBASE, codebase=codebase
+        One dict per agent: agent_name, agent_model and a "claims" list of
+        {node_type, node_path, claim_reason}.
+        """
+        if codebase:
+            return await self._execute(
+                queries.GET_ACTIVE_AGENTS_BY_CODEBASE, READ,
+                codebase=codebase, node_types=_NODE_TYPES_PARAM,
+            )
+        return await self._execute(
+            queries.GET_ACTIVE_AGENTS_ALL, READ, node_types=_NODE_TYPES_PARAM
         )
-        return [dict(record) async for record in result]
 
     # ------------------------------------------------------------------
     # query_codebase helpers
@@ -337,118 +653,120 @@ class Neo4jClient:
         path_filter: str | None = None,
         node_type: str | None = None,
         limit: int = 50,
+        offset: int = 0,
     ) -> list[dict]:
         """Search the graph for matching nodes with their claim status.
 
         node_type is validated against VALID_NODE_TYPES before being injected
-        into the Cypher template. path_filter uses fnmatch-style glob applied
-        in Python after retrieval (Neo4j has no built-in glob support without APOC).
+        into the Cypher template. path_filter is an fnmatch-style glob; it is
+        translated to a regex and matched server-side with =~ so exactly
+        `limit` rows come back over Bolt. Its literal prefix is also sent
+        for a STARTS WITH pre-filter that can use the path indexes.
+        Rows are ordered by path, so `offset` pages through the results.
         """
         if node_type and node_type not in VALID_NODE_TYPES:
             raise ValueError(
                 f"Invalid node_type '{node_type}'. "
-                f"Must be one of: {', '.join(sorted(VALID_NODE_TYPES))}"
+                f"Must be one of: {_VALID_NODE_TYPES_DISPLAY}"
             )
 
-        type_clause = f":{node_type}" if node_type else ""
-
-        # Build WHERE clause based on whether we're filtering by type
-        if node_type == "Codebase":
-            where_clause = "n.name = $codebase"
-        else:
-            where_clause = (
-                "((n:Codebase AND n.name = $codebase) OR (n.codebase = $codebase))"
-            )
-
-        # Fetch more results if we need to filter in Python
-        fetch_limit = limit * 5 if path_filter else limit
-
-        cypher = queries.QUERY_CODEBASE_TEMPLATE.format(
-            type_clause=type_clause,
-            where_clause=where_clause,
+        path_re = _glob_to_regex(path_filter) if path_filter else None
+        path_prefix = None
+        path_match = None
+        if path_re is not None:
+            path_prefix = _glob_prefix(path_filter)
+            rest = path_filter[len(path_prefix):]
+            path_match = "prefix" if rest and not rest.strip("*") else "glob"
+        cypher = QUERY_CODEBASE_VARIANTS[node_type, path_match]
+
+        return await self._execute(
+            cypher, READ, codebase=codebase, limit=limit, offset=offset,
+            path_re=path_re, path_prefix=path_prefix,
+            node_types=_NODE_TYPES_PARAM,
         )
 
-        async with self._driver.session(database=self._database) as session:
-            records = await session.execute_read(
-                self._run_query, cypher, codebase, fetch_limit
-            )
-
-        # Apply glob filter in Python for full fnmatch compatibility
-        if path_filter:
-            records = [
-                r
-                for r in records
-                if fnmatch.fnmatch(r.get("node_path", ""), path_filter)
-            ]
-
-        return records[:limit]
-
-    @staticmethod
-    async def _run_query(tx, cypher: str, codebase: str, limit: int) -> list[dict]:
-        result = await tx.run(cypher, codebase=codebase, limit=limit)
-        return [dict(record) async for record in result]
-
     # ------------------------------------------------------------------
     # messaging helpers
     # ------------------------------------------------------------------
 
     async def check_agent_exists(self, agent_name: str) -> dict | None:
-        """Return agent info dict if the Agent node exists, None otherwise."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_read(
-                self._run_check_agent_exists, agent_name
-            )
+        """Return agent info dict if the Agent node exists, None otherwise.
 
-    @staticmethod
-    async def _run_check_agent_exists(tx, agent_name: str) -> dict | None:
-        result = await tx.run(
-            queries.CHECK_AGENT_EXISTS, agent_name=agent_name
+        Found agents are cached for AGENT_EXISTS_TTL seconds. Another
+        server process may delete one in the meantime; send_message() then
+        returns None and drops the stale entry.
+        """
+        now = time.monotonic()
+        cached = self._agent_cache.get(agent_name)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        agent = await self._execute(
+            queries.CHECK_AGENT_EXISTS, READ, _single_data, agent_name=agent_name
         )
-        record = await result.single()
-        return dict(record) if record else None
+        if agent is None:
+            self._agent_cache.pop(agent_name, None)
+        else:
+            self._cache_agent(agent_name, agent, now)
+        return agent
+
+    def _cache_agent(self, agent_name: str, agent: dict, now: float) -> None:
+        """Cache a found agent, pruning expired entries when the cache is full."""
+        cache = self._agent_cache
+        cache.pop(agent_name, None)
+        if len(cache) >= AGENT_CACHE_SIZE:
+            for name in [n for n, (exp, _) in cache.items() if exp <= now]:
+                del cache[name]
+            if len(cache) >= AGENT_CACHE_SIZE:
+                # Still full of live entries: evict the oldest insertion.
+                del cache[next(iter(cache))]
+        cache[agent_name] = (now + AGENT_EXISTS_TTL, agent)
 
     async def send_message(self, to_agent: str, message_json: str) -> dict | None:
-        """Append a JSON-encoded message to the target agent's messages list."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_write(
-                self._run_send_message, to_agent, message_json
-            )
+        """Append a JSON-encoded message to the target agent's messages list.
 
-    @staticmethod
-    async def _run_send_message(tx, to_agent: str, message_json: str) -> dict | None:
-        result = await tx.run(
-            queries.SEND_MESSAGE, to_agent=to_agent, message=message_json
+        Returns {"message_count", "dropped"}, or None if the agent is gone
+        (its check_agent_exists() cache entry is dropped too). dropped is
+        true when the inbox was full (MAX_INBOX_SIZE) and its oldest
+        messages were discarded to make room.
+        """
+        result = await self._execute(
+            queries.SEND_MESSAGE, WRITE, _single_data,
+            to_agent=to_agent, message=message_json,
+            max_messages=MAX_INBOX_SIZE,
         )
-        record = await result.single()
-        return dict(record) if record else None
+        if result is None:
+            self._agent_cache.pop(to_agent, None)
+        return result
 
     async def get_messages(self, agent_name: str) -> list[str]:
         """Return the raw messages list (JSON strings) for an agent."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_read(
-                self._run_get_messages, agent_name
-            )
-
-    @staticmethod
-    async def _run_get_messages(tx, agent_name: str) -> list[str]:
-        result = await tx.run(
-            queries.GET_MESSAGES, agent_name=agent_name
+        record = await self._execute(
+            queries.GET_MESSAGES, READ, _single_data, agent_name=agent_name
         )
-        record = await result.single()
         if record:
-            return list(record["messages"])
+            # The driver already decodes list properties into a fresh list;
+            # callers only read it, so no defensive copy is needed.
+            messages = record["messages"]
+            return messages if isinstance(messages, list) else list(messages)
         return []
 
     async def clear_messages(self, agent_name: str) -> None:
         """Clear all messages for an agent."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_clear_messages, agent_name
-            )
+        await self._execute(
+            queries.CLEAR_MESSAGES, WRITE, AsyncResult.consume,
+            agent_name=agent_name,
+        )
 
-    @staticmethod
-    async def _run_clear_messages(tx, agent_name: str) -> None:
-        await tx.run(queries.CLEAR_MESSAGES, agent_name=agent_name)
+    async def drain_messages(self, agent_name: str) -> list[str]:
+        """Return an agent's messages and clear them atomically.
+
+        Prefer this over get_messages() followed by clear_messages().
+        """
+        record = await self._execute(
+            queries.DRAIN_MESSAGES, WRITE, _single_data, agent_name=agent_name
+        )
+        return record["messages"] if record else []
 
     # ------------------------------------------------------------------
     # agent cleanup helpers
@@ -456,26 +774,35 @@ class Neo4jClient:
 
     async def count_agent_claims(self, agent_name: str) -> int:
         """Return the number of remaining CLAIM relationships for an agent."""
-        async with self._driver.session(database=self._database) as session:
-            return await session.execute_read(
-                self._run_count_agent_claims, agent_name
-            )
-
-    @staticmethod
-    async def _run_count_agent_claims(tx, agent_name: str) -> int:
-        result = await tx.run(
-            queries.COUNT_AGENT_CLAIMS, agent_name=agent_name
+        record = await self._execute(
+            queries.COUNT_AGENT_CLAIMS, READ, _single_data, agent_name=agent_name
         )
-        record = await result.single()
         return record["claim_count"] if record else 0
 
     async def delete_agent(self, agent_name: str) -> None:
         """Delete an Agent node and all its relationships."""
-        async with self._driver.session(database=self._database) as session:
-            await session.execute_write(
-                self._run_delete_agent, agent_name
-            )
+        self._agent_cache.pop(agent_name, None)
+        await self._execute(
+            queries.DELETE_AGENT, WRITE, AsyncResult.consume,
+            agent_name=agent_name,
+        )
 
-    @staticmethod
-    async def _run_delete_agent(tx, agent_name: str) -> None:
-        await tx.run(queries.DELETE_AGENT, agent_name=agent_name)
+
+async def get_client(config: Neo4jConfig | None = None) -> Neo4jClient:
+    """Return the process-wide Neo4jClient, creating it on first use.
+
+    *config* is only used when the client is created; without it the
+    configuration is loaded from the environment.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = Neo4jClient(config or load_neo4j_config())
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the process-wide Neo4jClient, if one was created."""
+    global _CLIENT
+    client, _CLIENT = _CLIENT, None
+    if client is not None:
+        await client.close()
@@ -10,6 +10,60 @@ Queries are centralized here so they are easy to review, test, and change
 without touching tool logic in server.py or DB logic in neo4j_client.py.
 """
 
+# ===== SCHEMA =====
+
+# Constraints and indexes backing the MATCH/MERGE lookups below, keyed by the
+# name each one creates. Neo4jClient.bootstrap_schema() runs the ones that
+# don't exist yet at startup; every statement is idempotent regardless.
+# Function and Class get plain indexes rather than uniqueness constraints:
+# repo-graph keys Function on line_number too, so (file_path, name) is not
+# unique (e.g. two classes in one file that both define __init__).
+SCHEMA_STATEMENTS: dict[str, str] = {
+    "agent_name":
+        "CREATE CONSTRAINT agent_name IF NOT EXISTS "
+        "FOR (a:Agent) REQUIRE a.name IS UNIQUE",
+    "codebase_name":
+        "CREATE CONSTRAINT codebase_name IF NOT EXISTS "
+        "FOR (cb:Codebase) REQUIRE cb.name IS UNIQUE",
+    "file_codebase_path":
+        "CREATE CONSTRAINT file_codebase_path IF NOT EXISTS "
+        "FOR (f:File) REQUIRE (f.codebase, f.path) IS UNIQUE",
+    "directory_codebase_path":
+        "CREATE CONSTRAINT directory_codebase_path IF NOT EXISTS "
+        "FOR (d:Directory) REQUIRE (d.codebase, d.path) IS UNIQUE",
+    "function_codebase_file_name":
+        "CREATE INDEX function_codebase_file_name IF NOT EXISTS "
+        "FOR (fn:Function) ON (fn.codebase, fn.file_path, fn.name)",
+    "class_codebase_file_name":
+        "CREATE INDEX class_codebase_file_name IF NOT EXISTS "
+        "FOR (c:Class) ON (c.codebase, c.file_path, c.name)",
+    # DELETE_CLASSES finds a class's methods by owner_class, not by name.
+    "function_codebase_file_owner":
+        "CREATE INDEX function_codebase_file_owner IF NOT EXISTS "
+        "FOR (fn:Function) ON (fn.codebase, fn.file_path, fn.owner_class)",
+}
+
+# Page-cache warm-up, run in the background at startup. Each query reads a
+# property (or the type) of every record so the planner cannot answer it
+# from the count store, which would leave the store files untouched.
+WARM_NODES = """
+MATCH (n)
+WHERE n:Codebase OR n:Directory OR n:File OR n:Class OR n:Function OR n:Agent
+RETURN count(coalesce(n.path, n.name)) AS touched
+"""
+
+WARM_RELATIONSHIPS = """
+MATCH ()-[r:CONTAINS_DIR|CONTAINS_FILE|DEFINES_FUNCTION|DEFINES_CLASS|HAS_METHOD|CALLS|CLAIM]->()
+RETURN count(type(r)) AS touched
+"""
+
+# Names of the existing indexes. A uniqueness constraint's backing index
+# shares the constraint's name, so this covers every SCHEMA_STATEMENTS key.
+SHOW_INDEX_NAMES = """
+SHOW INDEXES YIELD name
+RETURN collect(name) AS names
+"""
+
 # ===== CLAIM NODE =====
 
 # Check if a node (File, Directory, or Codebase) exists for a given codebase.
@@ -18,7 +72,7 @@ CHECK_NODE_EXISTS = """
 MATCH (n)
 WHERE (n:Codebase AND n.name = $codebase AND $node_path = $codebase)
    OR ((n:File OR n:Directory) AND n.path = $node_path AND n.codebase = $codebase)
-RETURN labels(n) AS labels, coalesce(n.path, n.name) AS path, n.name AS name
+RETURN labels(n) AS labels, coalesce(n.path, n.name) AS path
 LIMIT 1
 """
 
@@ -30,29 +84,61 @@ WHERE (n:Codebase AND n.name = $codebase AND $node_path = $codebase)
 RETURN a.name AS agent_name, a.model AS agent_model, c.claim_reason AS claim_reason
 """
 
-# Create or merge the Agent node and the CLAIM relationship.
-# Uses MERGE for idempotency — calling twice with same args is a no-op.
-CREATE_CLAIM = """
-MERGE (a:Agent {name: $agent_name})
-SET a.model = $agent_model
-WITH a
-MATCH (n)
-WHERE (n:Codebase AND n.name = $codebase AND $node_path = $codebase)
-   OR ((n:File OR n:Directory) AND n.path = $node_path AND n.codebase = $codebase)
-MERGE (a)-[c:CLAIM]->(n)
-SET c.claim_reason = $claim_reason
-RETURN labels(n) AS labels, coalesce(n.path, n.name) AS path, n.name AS name
+# Whole claim flow in one write transaction, for each item in $items (one
+# item per claim; Neo4jClient.claim_node passes a one-element list). Per
+# item: look up the node, read its claims and create ours only when nobody
+# holds it. The SET/REMOVE pair takes the node's write lock before the claims
+# are read, so concurrent claims on the same node serialize instead of both
+# seeing it as free. Returns one row per item; `status` is one of not_found /
+# claimed / already_yours / conflict, and `claims` lists the holders seen
+# before this call.
+CLAIM_NODES = """
+UNWIND $items AS it
+CALL {
+    WITH it
+    OPTIONAL MATCH (n)
+    WHERE (n:Codebase AND n.name = it.codebase AND it.node_path = it.codebase)
+       OR ((n:File OR n:Directory) AND n.path = it.node_path AND n.codebase = it.codebase)
+    WITH it, n LIMIT 1
+    SET n._claim_lock = true
+    REMOVE n._claim_lock
+    WITH it, n
+    OPTIONAL MATCH (holder:Agent)-[hc:CLAIM]->(n)
+    WITH it, n, collect(CASE WHEN holder IS NOT NULL THEN {
+             agent_name: holder.name,
+             agent_model: holder.model,
+             claim_reason: hc.claim_reason
+         } END) AS claims
+    FOREACH (_ IN CASE WHEN n IS NOT NULL AND size(claims) = 0 THEN [1] ELSE [] END |
+        MERGE (a:Agent {name: it.agent_name})
+        ON CREATE SET a.messages = []
+        SET a.model = it.agent_model
+        MERGE (a)-[c:CLAIM]->(n)
+        SET c.claim_reason = it.claim_reason
+    )
+    RETURN CASE
+             WHEN n IS NULL THEN 'not_found'
+             WHEN size(claims) = 0 THEN 'claimed'
+             WHEN any(cl IN claims WHERE cl.agent_name = it.agent_name) THEN 'already_yours'
+             ELSE 'conflict'
+           END AS status,
+           labels(n) AS labels, coalesce(n.path, n.name) AS path,
+           claims
+}
+RETURN it.node_path AS node_path, status, labels, path, claims
 """
 
 # ===== RELEASE NODE =====
 
-# Remove a CLAIM relationship between a specific agent and a node.
+# Remove CLAIM relationships, one per item in $items (agent_name, node_path,
+# codebase). Returns a row only for items whose claim existed.
 # No longer returns root_path — reindexing is handled separately
 # by brocode_update_graph.
-RELEASE_CLAIM = """
-MATCH (a:Agent {name: $agent_name})-[c:CLAIM]->(n)
-WHERE (n:Codebase AND n.name = $codebase AND $node_path = $codebase)
-   OR ((n:File OR n:Directory) AND n.path = $node_path AND n.codebase = $codebase)
+RELEASE_CLAIMS = """
+UNWIND $items AS it
+MATCH (a:Agent {name: it.agent_name})-[c:CLAIM]->(n)
+WHERE (n:Codebase AND n.name = it.codebase AND it.node_path = it.codebase)
+   OR ((n:File OR n:Directory) AND n.path = it.node_path AND n.codebase = it.codebase)
 DELETE c
 RETURN a.name AS agent_name, labels(n) AS labels,
        coalesce(n.path, n.name) AS path
@@ -60,131 +146,174 @@ RETURN a.name AS agent_name, labels(n) AS labels,
 
 # ===== GRAPH UPDATE: UPSERT =====
 
-# Upsert a File node. MERGE on (path, codebase) for idempotency.
-# When parent_path is non-empty, links to parent Directory via CONTAINS_FILE.
-# When parent_path is empty (root-level file), links to the Codebase node.
-UPSERT_FILE = """
-MERGE (f:File {path: $path, codebase: $codebase})
-SET f.name = $name, f.extension = $extension, f.size_bytes = $size_bytes
-WITH f
+# All upserts take a list of rows in $rows and UNWIND them server-side, so a
+# whole batch is written in a single round-trip. Singular upserts in
+# neo4j_client.py simply pass a one-element list.
+
+# Upsert File nodes. MERGE on (path, codebase) for idempotency.
+# When row.parent_path is non-empty, links to parent Directory via CONTAINS_FILE.
+# When row.parent_path is empty (root-level file), links to the Codebase node.
+UPSERT_FILES = """
+UNWIND $rows AS row
+MERGE (f:File {path: row.path, codebase: $codebase})
+SET f.name = row.name, f.extension = row.extension, f.size_bytes = row.size_bytes
+WITH f, row
 CALL {
-    WITH f
-    WITH f WHERE $parent_path <> ''
-    MATCH (d:Directory {path: $parent_path, codebase: $codebase})
+    WITH f, row
+    WITH f, row WHERE row.parent_path <> ''
+    MATCH (d:Directory {path: row.parent_path, codebase: $codebase})
     MERGE (d)-[:CONTAINS_FILE]->(f)
 }
 CALL {
-    WITH f
-    WITH f WHERE $parent_path = ''
+    WITH f, row
+    WITH f, row WHERE row.parent_path = ''
     MATCH (cb:Codebase {name: $codebase})
     MERGE (cb)-[:CONTAINS_FILE]->(f)
 }
-RETURN f.path AS path
+RETURN count(f) AS upserted
 """
 
-# Upsert a Directory node. MERGE on (path, codebase) for idempotency.
-# When parent_path is non-empty, links to parent Directory via CONTAINS_DIR.
-# When parent_path is empty (top-level dir), links to the Codebase node.
-UPSERT_DIRECTORY = """
-MERGE (d:Directory {path: $path, codebase: $codebase})
-SET d.name = $name, d.depth = $depth
-WITH d
+# Upsert Directory nodes. MERGE on (path, codebase) for idempotency.
+# When row.parent_path is non-empty, links to parent Directory via CONTAINS_DIR.
+# When row.parent_path is empty (top-level dir), links to the Codebase node.
+UPSERT_DIRECTORIES = """
+UNWIND $rows AS row
+MERGE (d:Directory {path: row.path, codebase: $codebase})
+SET d.name = row.name, d.depth = row.depth
+WITH d, row
 CALL {
-    WITH d
-    WITH d WHERE $parent_path <> ''
-    MATCH (parent:Directory {path: $parent_path, codebase: $codebase})
+    WITH d, row
+    WITH d, row WHERE row.parent_path <> ''
+    MATCH (parent:Directory {path: row.parent_path, codebase: $codebase})
     MERGE (parent)-[:CONTAINS_DIR]->(d)
 }
 CALL {
-    WITH d
-    WITH d WHERE $parent_path = ''
+    WITH d, row
+    WITH d, row WHERE row.parent_path = ''
     MATCH (cb:Codebase {name: $codebase})
     MERGE (cb)-[:CONTAINS_DIR]->(d)
 }
-RETURN d.path AS path
+RETURN count(d) AS upserted
 """
 
-# Upsert a Function node. MERGE on (file_path, name, codebase) for idempotency.
+# Upsert Function nodes. MERGE on (file_path, name, codebase) for idempotency.
 # Links to parent File via DEFINES_FUNCTION edge (when File exists).
-# If the function is a method (owner_class is set), also creates HAS_METHOD
-# edge from the Class node to the Function.
-UPSERT_FUNCTION = """
-MERGE (fn:Function {file_path: $file_path, name: $name, codebase: $codebase})
-SET fn.line_number = $line_number, fn.is_method = $is_method,
-    fn.parameters = $parameters, fn.owner_class = $owner_class
-WITH fn
-OPTIONAL MATCH (f:File {path: $file_path, codebase: $codebase})
+# If the function is a method (row.owner_class is set), also creates
+# HAS_METHOD edge from the Class node to the Function.
+UPSERT_FUNCTIONS = """
+UNWIND $rows AS row
+MERGE (fn:Function {file_path: row.file_path, name: row.name, codebase: $codebase})
+SET fn.line_number = row.line_number, fn.is_method = row.is_method,
+    fn.parameters = row.parameters, fn.owner_class = row.owner_class
+WITH fn, row
+OPTIONAL MATCH (f:File {path: row.file_path, codebase: $codebase})
 FOREACH (_ IN CASE WHEN f IS NOT NULL THEN [1] ELSE [] END |
     MERGE (f)-[:DEFINES_FUNCTION]->(fn)
 )
-WITH fn
+WITH fn, row
 CALL {
-    WITH fn
-    WITH fn WHERE $owner_class <> ''
-    MATCH (cls:Class {file_path: $file_path, name: $owner_class, codebase: $codebase})
+    WITH fn, row
+    WITH fn, row WHERE row.owner_class <> ''
+    MATCH (cls:Class {file_path: row.file_path, name: row.owner_class, codebase: $codebase})
     MERGE (cls)-[:HAS_METHOD]->(fn)
 }
-RETURN fn.name AS name
+RETURN count(fn) AS upserted
 """
 
-# Upsert a Class node. MERGE on (file_path, name, codebase) for idempotency.
+# Upsert Class nodes. MERGE on (file_path, name, codebase) for idempotency.
 # Links to parent File via DEFINES_CLASS edge (when File exists).
-UPSERT_CLASS = """
-MERGE (c:Class {file_path: $file_path, name: $name, codebase: $codebase})
-SET c.line_number = $line_number, c.base_classes = $base_classes
-WITH c
-OPTIONAL MATCH (f:File {path: $file_path, codebase: $codebase})
+UPSERT_CLASSES = """
+UNWIND $rows AS row
+MERGE (c:Class {file_path: row.file_path, name: row.name, codebase: $codebase})
+SET c.line_number = row.line_number, c.base_classes = row.base_classes
+WITH c, row
+OPTIONAL MATCH (f:File {path: row.file_path, codebase: $codebase})
 FOREACH (_ IN CASE WHEN f IS NOT NULL THEN [1] ELSE [] END |
     MERGE (f)-[:DEFINES_CLASS]->(c)
 )
-RETURN c.name AS name
+RETURN count(c) AS upserted
 """
 
 # ===== GRAPH UPDATE: DELETE =====
 
-# Delete a File node and its AST children (Function, Class).
-DELETE_FILE = """
-MATCH (f:File {path: $path, codebase: $codebase})
-OPTIONAL MATCH (f)-[*]->(child)
-DETACH DELETE child
-WITH f
+# Like the upserts, deletes UNWIND a list of rows in $rows. Each row's
+# cascade runs in its own CALL subquery so rows whose subtrees overlap (a
+# directory and a file inside it) don't trip over each other's deletions.
+
+# Subtree traversals only follow containment/definition edges. An untyped
+# [*] would also walk CALLS/IMPORTS edges into other files and delete them,
+# and would enumerate every path through the graph rather than every node.
+# Along these edge types the graph is a shallow DAG, so DISTINCT collapses
+# the few duplicate paths (a method is reachable via its file and its class).
+
+# Delete File nodes and their AST children (Function, Class).
+DELETE_FILES = """
+UNWIND $rows AS row
+MATCH (f:File {path: row.path, codebase: $codebase})
+CALL {
+    WITH f
+    OPTIONAL MATCH (f)-[:DEFINES_FUNCTION|DEFINES_CLASS|HAS_METHOD*1..2]->(child)
+    WITH DISTINCT child
+    DETACH DELETE child
+}
 DETACH DELETE f
 """
 
-# Delete a Directory node and all nodes reachable below it.
-DELETE_DIRECTORY = """
-MATCH (d:Directory {path: $path, codebase: $codebase})
-OPTIONAL MATCH (d)-[*]->(descendant)
-DETACH DELETE descendant
-WITH d
+# Delete Directory nodes and everything contained below them.
+DELETE_DIRECTORIES = """
+UNWIND $rows AS row
+MATCH (d:Directory {path: row.path, codebase: $codebase})
+CALL {
+    WITH d
+    OPTIONAL MATCH (d)-[:CONTAINS_DIR|CONTAINS_FILE|DEFINES_FUNCTION|DEFINES_CLASS|HAS_METHOD*]->(descendant)
+    WITH DISTINCT descendant
+    DETACH DELETE descendant
+}
 DETACH DELETE d
 """
 
-# Delete a specific Function node.
-DELETE_FUNCTION = """
-MATCH (fn:Function {file_path: $file_path, name: $name, codebase: $codebase})
+# Delete specific Function nodes.
+DELETE_FUNCTIONS = """
+UNWIND $rows AS row
+MATCH (fn:Function {file_path: row.file_path, name: row.name, codebase: $codebase})
 DETACH DELETE fn
 """
 
-# Delete a Class node and its methods (Functions with owner_class matching).
-DELETE_CLASS = """
-MATCH (c:Class {file_path: $file_path, name: $name, codebase: $codebase})
-OPTIONAL MATCH (fn:Function {file_path: $file_path, owner_class: $name, codebase: $codebase})
-DETACH DELETE fn
-WITH c
+# Delete Class nodes and their methods (Functions with owner_class matching).
+DELETE_CLASSES = """
+UNWIND $rows AS row
+MATCH (c:Class {file_path: row.file_path, name: row.name, codebase: $codebase})
+CALL {
+    WITH c, row
+    OPTIONAL MATCH (fn:Function {file_path: row.file_path, owner_class: row.name, codebase: $codebase})
+    DETACH DELETE fn
+}
 DETACH DELETE c
 """
 
 # ===== GET ACTIVE AGENTS =====
 
+# Both queries return one row per agent with its claims collected server-side
+# (claims ordered by node_path, agents by name), so the result is already
+# grouped the way brocode_get_active_agents reports it. node_type is the
+# node's first label in $node_types (VALID_NODE_TYPES, passed by
+# Neo4jClient), or 'Unknown'.
+
 # Return all CLAIM relationships across all codebases.
 GET_ACTIVE_AGENTS_ALL = """
 MATCH (a:Agent)-[c:CLAIM]->(n)
-RETURN a.name AS agent_name, a.model AS agent_model,
-       labels(n) AS node_labels,
-       coalesce(n.path, n.name) AS node_path,
-       c.claim_reason AS claim_reason
-ORDER BY a.name, node_path
+WITH a, c, n, coalesce(n.path, n.name) AS node_path
+ORDER BY node_path
+WITH a, collect({
+    node_type: coalesce(
+        head([l IN labels(n) WHERE l IN $node_types]),
+        'Unknown'
+    ),
+    node_path: node_path,
+    claim_reason: c.claim_reason
+}) AS claims
+RETURN a.name AS agent_name, a.model AS agent_model, claims
+ORDER BY agent_name
 """
 
 # Return CLAIM relationships filtered to a specific codebase.
@@ -192,11 +321,18 @@ GET_ACTIVE_AGENTS_BY_CODEBASE = """
 MATCH (a:Agent)-[c:CLAIM]->(n)
 WHERE (n:Codebase AND n.name = $codebase)
    OR ((n:File OR n:Directory) AND n.codebase = $codebase)
-RETURN a.name AS agent_name, a.model AS agent_model,
-       labels(n) AS node_labels,
-       coalesce(n.path, n.name) AS node_path,
-       c.claim_reason AS claim_reason
-ORDER BY a.name, node_path
+WITH a, c, n, coalesce(n.path, n.name) AS node_path
+ORDER BY node_path
+WITH a, collect({
+    node_type: coalesce(
+        head([l IN labels(n) WHERE l IN $node_types]),
+        'Unknown'
+    ),
+    node_path: node_path,
+    claim_reason: c.claim_reason
+}) AS claims
+RETURN a.name AS agent_name, a.model AS agent_model, claims
+ORDER BY agent_name
 """
 
 # ===== QUERY CODEBASE =====
@@ -205,16 +341,22 @@ ORDER BY a.name, node_path
 # {type_clause} and {where_clause} are injected by neo4j_client.py after
 # validating against an allowlist. $codebase and $limit remain parameterized.
 # Neo4j does not support parameterized labels, so string formatting is required.
+# node_type is derived the same way as in the GET ACTIVE AGENTS queries.
+# claimed_by breaks ties between rows of the same node so SKIP pages are stable.
 QUERY_CODEBASE_TEMPLATE = """
 MATCH (n{type_clause})
 WHERE {where_clause}
 OPTIONAL MATCH (a:Agent)-[c:CLAIM]->(n)
-RETURN labels(n) AS node_labels,
+RETURN coalesce(
+           head([l IN labels(n) WHERE l IN $node_types]),
+           'Unknown'
+       ) AS node_type,
        coalesce(n.path, n.name) AS node_path,
        n.name AS node_name,
        a.name AS claimed_by,
        c.claim_reason AS claim_reason
-ORDER BY node_path
+ORDER BY node_path, claimed_by
+SKIP $offset
 LIMIT $limit
 """
 
@@ -228,12 +370,20 @@ LIMIT 1
 """
 
 # Append a JSON-encoded message string to the target agent's messages list.
-# Uses coalesce to initialize the list if it doesn't exist yet.
+# Agents get an empty list when created by a claim, so this is a plain
+# append; the coalesce only covers Agent nodes created before that.
 # Wraps $message in a list so Neo4j appends a single element (not char-by-char).
+# The inbox is capped at $max_messages: once full, the oldest entries are
+# dropped to make room, and `dropped` reports that this happened.
 SEND_MESSAGE = """
 MATCH (a:Agent {name: $to_agent})
-SET a.messages = coalesce(a.messages, []) + [$message]
-RETURN size(a.messages) AS message_count
+WITH a, coalesce(a.messages, []) AS inbox
+WITH a, inbox, size(inbox) >= $max_messages AS dropped
+SET a.messages = CASE
+        WHEN dropped THEN inbox[size(inbox) - $max_messages + 1..]
+        ELSE inbox
+    END + [$message]
+RETURN size(a.messages) AS message_count, dropped
 """
 
 # Retrieve the messages list for an agent.
@@ -248,6 +398,15 @@ MATCH (a:Agent {name: $agent_name})
 SET a.messages = []
 """
 
+# Read and clear an agent's messages in one write transaction, so a message
+# sent between a separate read and clear can't be lost.
+DRAIN_MESSAGES = """
+MATCH (a:Agent {name: $agent_name})
+WITH a, coalesce(a.messages, []) AS messages
+SET a.messages = []
+RETURN messages
+"""
+
 # ===== AGENT CLEANUP =====
 
 # Count remaining CLAIM relationships for an agent.
@@ -14,18 +14,29 @@ startup via the lifespan and shared across all tool invocations.
 
 from __future__ import annotations
 
+import asyncio
+import importlib.util
+import itertools
 import json
 import logging
-import os
 import sys
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import AsyncIterator
+from typing import AsyncIterator, Callable, NoReturn
 
 from fastmcp import Context, FastMCP
+from neo4j import AsyncSession
+from neo4j.exceptions import DriverError, Neo4jError
 
 from brocode_mcp.env import load_neo4j_config
-from brocode_mcp.neo4j_client import Neo4jClient
+from brocode_mcp.neo4j_client import (
+    _VALID_NODE_TYPES_DISPLAY,
+    VALID_NODE_TYPES,
+    Neo4jClient,
+    close_client,
+    get_client,
+)
 
 # For stdio transport, never log to stdout — it corrupts the MCP protocol.
 logging.basicConfig(
@@ -35,11 +46,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger("brocode_mcp")
 
+# Message payloads are encoded/decoded with orjson when it is installed
+# (pip install brocode-mcp[fast]); the stdlib json module is the fallback.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling
+# is the same either way.
+try:
+    import orjson
+
+    def _json_dumps(obj: dict) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except orjson.JSONEncodeError:
+            # orjson rejects strings json accepts, e.g. lone surrogates.
+            return json.dumps(obj)
+
+    def _json_loads(raw: str):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Reads back what the json.dumps fallback above wrote.
+            return json.loads(raw)
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 
 # ------------------------------------------------------------------
 # Lifespan: create and tear down the Neo4j async driver once
 # ------------------------------------------------------------------
 
+# The client yielded by app_lifespan, while it is running. Lets _get_db()
+# skip the per-call walk through the request context.
+_DB: Neo4jClient | None = None
+
+# The neo4j driver picks up its Rust Bolt codec (neo4j-rust-ext, also part of
+# brocode-mcp[fast]) automatically when the extension is importable; nothing
+# else needs configuring. Logged at startup so a missing wheel is visible.
+_HAS_RUST_CODEC = importlib.util.find_spec("neo4j._rust") is not None
+
+# Upper bound (seconds) on the schema bootstrap at startup. execute_query()
+# retries an unreachable server for ~30 s; startup shouldn't wait that long.
+SCHEMA_BOOTSTRAP_TIMEOUT = 5.0
+
+
+async def _warm_up(db: Neo4jClient) -> None:
+    """Background task: warm query plans, then Neo4j's page cache.
+
+    Both are best-effort; failures are logged instead of raised.
+    """
+    try:
+        await db.warm_query_plans()
+    except (DriverError, Neo4jError) as exc:
+        logger.warning("Query-plan warm-up failed: %s", exc)
+    try:
+        await db.warm_page_cache()
+    except (DriverError, Neo4jError) as exc:
+        logger.warning("Page-cache warm-up failed: %s", exc)
+    else:
+        logger.info("Neo4j page cache warmed.")
+
 
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[dict]:
@@ -49,16 +114,44 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[dict]:
     ctx.request_context.lifespan_context["db"] (FastMCP >=2.3 API).
     """
     config = load_neo4j_config()
-    db = Neo4jClient(config)
+    db = await get_client(config)
     logger.info(
-        "Neo4j async driver initialized (uri=%s, database=%s)",
+        "Neo4j async driver initialized "
+        "(uri=%s, database=%s, pool_size=%d, rust_codec=%s)",
         config.uri,
         config.database,
+        config.max_connection_pool_size,
+        _HAS_RUST_CODEC,
     )
+    warm_task: asyncio.Task | None = None
+    try:
+        await asyncio.wait_for(db.bootstrap_schema(), SCHEMA_BOOTSTRAP_TIMEOUT)
+        # Plan and page-cache warm-up take many round trips (and a while on
+        # big graphs); every stdio agent starts its own server, so don't make
+        # startup or the first tool call wait for them.
+        warm_task = asyncio.create_task(_warm_up(db))
+    except (DriverError, Neo4jError) as exc:
+        # Neo4j may not be up yet, or may refuse a statement (schema or
+        # permission problems). Bootstrap and warm-up are best-effort: the
+        # server still starts and tools report errors individually.
+        logger.warning("Skipping schema bootstrap and warm-up: %s", exc)
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Skipping schema bootstrap and warm-up: Neo4j did not "
+            "answer within %.0f s", SCHEMA_BOOTSTRAP_TIMEOUT,
+        )
+    global _DB
+    _DB = db
     try:
         yield {"db": db}
     finally:
-        await db.close()
+        _DB = None
+        if warm_task is not None:
+            # Let the task finish unwinding before the driver is closed.
+            warm_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await warm_task
+        await close_client()
         logger.info("Neo4j async driver closed.")
 
 
@@ -77,9 +170,6 @@ mcp = FastMCP(
     lifespan=app_lifespan,
 )
 
-# Valid node types for query filtering — also used by neo4j_client.py
-VALID_NODE_TYPES = {"File", "Directory", "Codebase", "Class", "Function"}
-
 
 # ===================================================================
 # MCP Resources — static reference documents for agents
@@ -337,9 +427,13 @@ If some changes succeed and others fail, you get status `"partial"`:
 {
   "status": "partial",
   "applied": 3,
+  "error_count": 1,
   "errors": ["Change 2: missing required field 'path' for upsert File."]
 }
 ```
+
+Only the first 50 error messages are returned; `error_count` is always the
+full total. Pass `include_all_errors: true` to get every message.
 """
 
 
@@ -363,6 +457,9 @@ Parameters:
 - `message` — free-text content describing your request
 - `node_path` (optional) — the node the message is about
 
+An inbox holds at most 1000 messages. When it is full, the oldest ones are
+discarded to make room and the response has `"dropped": true`.
+
 ### brocode_get_messages
 Retrieve your inbox. Returns a list of message dicts, each with:
 - `from` — sender agent name
@@ -370,6 +467,13 @@ Retrieve your inbox. Returns a list of message dicts, each with:
 - `node_path` — related node (may be empty)
 - `timestamp` — ISO 8601 UTC timestamp
 
+Pass `clear=true` to read and empty the inbox in one atomic step — no
+message sent in between can be lost, and no separate clear call is needed.
+
+Pass `await_ms` (up to 30000) to wait for mail instead of returning an
+empty inbox straight away: the call returns as soon as a message arrives
+or the wait runs out, whichever comes first.
+
 ### brocode_clear_messages
 Clear your inbox after processing messages. Safe to call on an empty inbox.
 
@@ -380,9 +484,11 @@ Clear your inbox after processing messages. Safe to call on an empty inbox.
   guessing.
 - **No self-messaging** — `from_agent` and `to_agent` must differ.
 - **Poll periodically** — while you hold claims, call `brocode_get_messages`
-  every few steps so you notice requests promptly.
-- **Clear after reading** — call `brocode_clear_messages` once you have
-  processed your inbox to keep it clean.
+  every few steps so you notice requests promptly. When you are idle and
+  only waiting on another agent, use `await_ms` rather than a tight loop.
+- **Clear after reading** — call `brocode_get_messages` with `clear=true`,
+  or `brocode_clear_messages` once you have processed your inbox, to keep
+  it clean.
 
 ## Typical flow
 
@@ -402,8 +508,11 @@ def _get_db(ctx: Context) -> Neo4jClient:
 
     In FastMCP >=2.3 the lifespan dict moved from ctx.lifespan_context to
     ctx.request_context.lifespan_context.  This helper keeps tool code
-    decoupled from that internal change.
+    decoupled from that internal change. While app_lifespan is active the
+    same client is returned from the module-level _DB directly.
     """
+    if _DB is not None:
+        return _DB
     return ctx.request_context.lifespan_context["db"]
 
 
@@ -456,9 +565,14 @@ async def brocode_claim_node(
             ),
         }
 
-    # Step 1: Verify the node exists in the graph
-    node = await db.check_node_exists(node_path, codebase_name)
-    if node is None:
+    # Existence check, conflict check and claim creation run as one write
+    # transaction; the result's status tells us which branch was taken.
+    result = await db.claim_node(
+        agent_name, agent_model, node_path, codebase_name, claim_reason
+    )
+    status = result["status"]
+
+    if status == "not_found":
         return {
             "status": "error",
             "message": (
@@ -467,32 +581,26 @@ async def brocode_claim_node(
             ),
         }
 
-    # Step 2: Check for existing claims
-    claims = await db.check_existing_claim(node_path, codebase_name)
-    for claim in claims:
-        if claim["agent_name"] == agent_name:
-            return {
-                "status": "already_yours",
-                "message": f"You ({agent_name}) already have this node claimed.",
-                "node_path": node_path,
-            }
-        else:
-            return {
-                "status": "conflict",
-                "message": (
-                    f"CONFLICT: '{claim['agent_name']}' ({claim['agent_model']}) "
-                    f"is currently working on '{node_path}'."
-                ),
-                "claimed_by": claim["agent_name"],
-                "claim_reason": claim.get("claim_reason", ""),
-            }
-
-    # Step 3: Create the claim
-    result = await db.create_claim(
-        agent_name, agent_model, node_path, codebase_name, claim_reason
-    )
-    if result is None:
-        return {"status": "error", "message": "Failed to create claim (unexpected)."}
+    if status == "already_yours":
+        return {
+            "status": "already_yours",
+            "message": f"You ({agent_name}) already have this node claimed.",
+            "node_path": node_path,
+        }
+
+    if status == "conflict":
+        claim = next(
+            c for c in result["claims"] if c["agent_name"] != agent_name
+        )
+        return {
+            "status": "conflict",
+            "message": (
+                f"CONFLICT: '{claim['agent_name']}' ({claim['agent_model']}) "
+                f"is currently working on '{node_path}'."
+            ),
+            "claimed_by": claim["agent_name"],
+            "claim_reason": claim.get("claim_reason", ""),
+        }
 
     logger.info(
         "Agent '%s' claimed node '%s' in codebase '%s'",
@@ -580,20 +688,14 @@ async def brocode_release_node(
 
 
 # Valid node types that brocode_update_graph accepts for changes.
-_UPDATE_NODE_TYPES = {"File", "Directory", "Function", "Class"}
-_UPDATE_ACTIONS = {"upsert", "delete"}
-
-# Required fields per (action, node_type) pair.
-_REQUIRED_FIELDS: dict[tuple[str, str], list[str]] = {
-    ("upsert", "File"): ["path"],
-    ("upsert", "Directory"): ["path"],
-    ("upsert", "Function"): ["file_path", "function_name"],
-    ("upsert", "Class"): ["file_path", "class_name"],
-    ("delete", "File"): ["path"],
-    ("delete", "Directory"): ["path"],
-    ("delete", "Function"): ["file_path", "function_name"],
-    ("delete", "Class"): ["file_path", "class_name"],
-}
+_UPDATE_NODE_TYPES = frozenset({"File", "Directory", "Function", "Class"})
+_UPDATE_ACTIONS = frozenset({"upsert", "delete"})
+_UPDATE_NODE_TYPES_DISPLAY = ", ".join(sorted(_UPDATE_NODE_TYPES))
+_UPDATE_ACTIONS_DISPLAY = ", ".join(sorted(_UPDATE_ACTIONS))
+
+# Per-change error messages returned by default; "error_count" always
+# carries the full number so a large failed batch doesn't bloat the reply.
+_MAX_REPORTED_ERRORS = 50
 
 
 @mcp.tool(
@@ -608,6 +710,7 @@ _REQUIRED_FIELDS: dict[tuple[str, str], list[str]] = {
 async def brocode_update_graph(
     codebase_name: str,
     changes: list[dict],
+    include_all_errors: bool = False,
     ctx: Context = None,
 ) -> dict:
     """Apply per-node graph updates (upsert or delete) directly to Neo4j.
@@ -628,10 +731,12 @@ async def brocode_update_graph(
               optionally "line_number", "is_method", "parameters", "owner_class"
             - For Class: "file_path" + "class_name" (required),
               optionally "line_number", "base_classes"
+        include_all_errors: Return every error message instead of only
+            the first 50 (by change index).
 
     Returns:
         A dict with "status" ("ok", "partial", "error"),
-        "applied" count, and "errors" list.
+        "applied" count, "error_count", and "errors" list.
     """
     # Top-level validation
     if not codebase_name or not codebase_name.strip():
@@ -644,121 +749,242 @@ async def brocode_update_graph(
 
     db: Neo4jClient = _get_db(ctx)
     applied = 0
-    errors: list[str] = []
+    failures: list[tuple[int, str]] = []  # (change index, message)
 
+    valid: list[tuple[int, dict]] = []
     for i, change in enumerate(changes):
         try:
             _apply_single_change(change, i)  # validate
-            await _dispatch_change(db, codebase_name, change)
-            applied += 1
+            valid.append((i, change))
         except ValueError as exc:
-            errors.append(str(exc))
-        except Exception as exc:
-            errors.append(f"Change {i}: {exc}")
-
-    if not errors:
+            failures.append((i, str(exc)))
+
+    # One session for the whole batch instead of one per change. Consecutive
+    # changes of the same (action, node_type) go out as one UNWIND batch; if
+    # that batch fails, its changes are retried one by one so each error is
+    # attributed to the change that caused it. Order between runs is kept.
+    async with db.session() as session:
+        for key, run in itertools.groupby(valid, key=_change_key):
+            run = list(run)
+            if len(run) > 1:
+                try:
+                    await _dispatch_batch(db, codebase_name, key, run, session)
+                    applied += len(run)
+                    continue
+                except Exception:
+                    logger.warning(
+                        "Batched %s %s failed; retrying changes individually",
+                        *key, exc_info=True,
+                    )
+            for i, change in run:
+                try:
+                    await _dispatch_change(db, codebase_name, change, session)
+                    applied += 1
+                except Exception as exc:
+                    failures.append((i, f"Change {i}: {exc}"))
+
+    error_count = len(failures)
+    failures.sort()
+    if not include_all_errors:
+        del failures[_MAX_REPORTED_ERRORS:]
+    errors = [msg for _, msg in failures]
+
+    if not error_count:
         status = "ok"
     elif applied > 0:
         status = "partial"
     else:
         status = "error"
 
-    return {"status": status, "applied": applied, "errors": errors}
+    return {
+        "status": status,
+        "applied": applied,
+        "error_count": error_count,
+        "errors": errors,
+    }
 
 
 def _apply_single_change(change: dict, index: int) -> None:
     """Validate a single change dict. Raises ValueError on problems."""
     action = change.get("action")
+    node_type = change.get("node_type")
+    # JSON input can hold lists or objects here, which can't be hashed for
+    # the table lookup below.
+    if not isinstance(action, str) or not isinstance(node_type, str):
+        _raise_invalid_pair(action, node_type, index)
+    # Valid (action, node_type) pairs need a single table lookup; the
+    # individual checks in _raise_invalid_pair only run to explain a miss.
+    op = _UPDATE_OPS.get((action, node_type))
+    if op is None:
+        _raise_invalid_pair(action, node_type, index)
+
+    for field in op.required:
+        if not change.get(field):
+            raise ValueError(
+                f"Change {index}: missing required field '{field}' "
+                f"for {action} {node_type}."
+            )
+
+
+def _raise_invalid_pair(action, node_type, index: int) -> NoReturn:
+    """Raise the ValueError describing an unknown (action, node_type) pair."""
     if not action:
         raise ValueError(f"Change {index}: missing required field 'action'.")
-    if action not in _UPDATE_ACTIONS:
+    if not isinstance(action, str) or action not in _UPDATE_ACTIONS:
         raise ValueError(
             f"Change {index}: invalid action '{action}'. "
-            f"Must be one of: {', '.join(sorted(_UPDATE_ACTIONS))}."
+            f"Must be one of: {_UPDATE_ACTIONS_DISPLAY}."
         )
 
-    node_type = change.get("node_type")
     if not node_type:
         raise ValueError(f"Change {index}: missing required field 'node_type'.")
-    if node_type not in _UPDATE_NODE_TYPES:
-        raise ValueError(
-            f"Change {index}: invalid node_type '{node_type}'. "
-            f"Must be one of: {', '.join(sorted(_UPDATE_NODE_TYPES))}."
-        )
+    raise ValueError(
+        f"Change {index}: invalid node_type '{node_type}'. "
+        f"Must be one of: {_UPDATE_NODE_TYPES_DISPLAY}."
+    )
 
-    required = _REQUIRED_FIELDS.get((action, node_type), [])
-    for field in required:
-        if not change.get(field):
-            raise ValueError(
-                f"Change {index}: missing required field '{field}' "
-                f"for {action} {node_type}."
-            )
+
+# Row builders: map a validated change to the fields its Neo4jClient method
+# expects, filling in the documented defaults.
 
 
-async def _dispatch_change(db: Neo4jClient, codebase: str, change: dict) -> None:
+def _file_extension(name: str) -> str:
+    """Same result as os.path.splitext(name)[1] for a POSIX basename."""
+    dot = name.rfind(".")
+    # Leading dots (".gitignore", "..rc") don't start an extension.
+    if dot <= 0 or not name[:dot].strip("."):
+        return ""
+    return name[dot:]
+
+
+def _upsert_file_row(change: dict) -> dict:
+    path = change["path"]
+    name = path.rpartition("/")[2]
+    return {
+        "path": path,
+        "name": change.get("name") or name,
+        "extension": change.get("extension") or _file_extension(name),
+        "size_bytes": change.get("size_bytes", 0),
+        "parent_path": change.get("parent_path", ""),
+    }
+
+
+def _upsert_directory_row(change: dict) -> dict:
+    path = change["path"]
+    return {
+        "path": path,
+        "name": change.get("name") or path.rpartition("/")[2],
+        "depth": change.get("depth", 0),
+        "parent_path": change.get("parent_path", ""),
+    }
+
+
+def _upsert_function_row(change: dict) -> dict:
+    return {
+        "file_path": change["file_path"],
+        "name": change["function_name"],
+        "line_number": change.get("line_number", 0),
+        "is_method": change.get("is_method", False),
+        "parameters": change.get("parameters", ""),
+        "owner_class": change.get("owner_class", ""),
+    }
+
+
+def _upsert_class_row(change: dict) -> dict:
+    return {
+        "file_path": change["file_path"],
+        "name": change["class_name"],
+        "line_number": change.get("line_number", 0),
+        "base_classes": change.get("base_classes", ""),
+    }
+
+
+def _path_row(change: dict) -> dict:
+    return {"path": change["path"]}
+
+
+def _function_ref_row(change: dict) -> dict:
+    return {"file_path": change["file_path"], "name": change["function_name"]}
+
+
+def _class_ref_row(change: dict) -> dict:
+    return {"file_path": change["file_path"], "name": change["class_name"]}
+
+
+@dataclass(frozen=True)
+class _UpdateOp:
+    """How one (action, node_type) pair is validated and applied.
+
+    method takes row(change)'s keys as keyword arguments; batch_method takes
+    a list of such rows.
+    """
+
+    required: tuple[str, ...]
+    row: Callable[[dict], dict]
+    method: str
+    batch_method: str
+
+
+_UPDATE_OPS: dict[tuple[str, str], _UpdateOp] = {
+    ("upsert", "File"): _UpdateOp(
+        ("path",), _upsert_file_row, "upsert_file", "upsert_files_batch"
+    ),
+    ("upsert", "Directory"): _UpdateOp(
+        ("path",), _upsert_directory_row,
+        "upsert_directory", "upsert_directories_batch",
+    ),
+    ("upsert", "Function"): _UpdateOp(
+        ("file_path", "function_name"), _upsert_function_row,
+        "upsert_function", "upsert_functions_batch",
+    ),
+    ("upsert", "Class"): _UpdateOp(
+        ("file_path", "class_name"), _upsert_class_row,
+        "upsert_class", "upsert_classes_batch",
+    ),
+    ("delete", "File"): _UpdateOp(
+        ("path",), _path_row, "delete_file", "delete_files_batch"
+    ),
+    ("delete", "Directory"): _UpdateOp(
+        ("path",), _path_row, "delete_directory", "delete_directories_batch"
+    ),
+    ("delete", "Function"): _UpdateOp(
+        ("file_path", "function_name"), _function_ref_row,
+        "delete_function", "delete_functions_batch",
+    ),
+    ("delete", "Class"): _UpdateOp(
+        ("file_path", "class_name"), _class_ref_row,
+        "delete_class", "delete_classes_batch",
+    ),
+}
+
+
+def _change_key(item: tuple[int, dict]) -> tuple[str, str]:
+    """Group key for an (index, change) pair: its (action, node_type)."""
+    change = item[1]
+    return change["action"], change["node_type"]
+
+
+async def _dispatch_change(
+    db: Neo4jClient, codebase: str, change: dict, session: AsyncSession
+) -> None:
     """Dispatch a validated change to the appropriate DB method."""
-    action = change["action"]
-    node_type = change["node_type"]
-
-    if action == "upsert":
-        if node_type == "File":
-            path = change["path"]
-            name = change.get("name") or os.path.basename(path)
-            extension = change.get("extension") or os.path.splitext(path)[1]
-            await db.upsert_file(
-                codebase=codebase,
-                path=path,
-                name=name,
-                extension=extension,
-                size_bytes=change.get("size_bytes", 0),
-                parent_path=change.get("parent_path", ""),
-            )
-        elif node_type == "Directory":
-            path = change["path"]
-            name = change.get("name") or os.path.basename(path)
-            await db.upsert_directory(
-                codebase=codebase,
-                path=path,
-                name=name,
-                depth=change.get("depth", 0),
-                parent_path=change.get("parent_path", ""),
-            )
-        elif node_type == "Function":
-            await db.upsert_function(
-                codebase=codebase,
-                file_path=change["file_path"],
-                name=change["function_name"],
-                line_number=change.get("line_number", 0),
-                is_method=change.get("is_method", False),
-                parameters=change.get("parameters", ""),
-                owner_class=change.get("owner_class", ""),
-            )
-        elif node_type == "Class":
-            await db.upsert_class(
-                codebase=codebase,
-                file_path=change["file_path"],
-                name=change["class_name"],
-                line_number=change.get("line_number", 0),
-                base_classes=change.get("base_classes", ""),
-            )
+    op = _UPDATE_OPS[change["action"], change["node_type"]]
+    await getattr(db, op.method)(
+        codebase=codebase, **op.row(change), session=session
+    )
 
-    elif action == "delete":
-        if node_type == "File":
-            await db.delete_file(path=change["path"], codebase=codebase)
-        elif node_type == "Directory":
-            await db.delete_directory(path=change["path"], codebase=codebase)
-        elif node_type == "Function":
-            await db.delete_function(
-                file_path=change["file_path"],
-                name=change["function_name"],
-                codebase=codebase,
-            )
-        elif node_type == "Class":
-            await db.delete_class(
-                file_path=change["file_path"],
-                name=change["class_name"],
-                codebase=codebase,
-            )
+
+async def _dispatch_batch(
+    db: Neo4jClient,
+    codebase: str,
+    key: tuple[str, str],
+    run: list[tuple[int, dict]],
+    session: AsyncSession,
+) -> None:
+    """Apply a run of validated changes sharing *key* as one UNWIND batch."""
+    op = _UPDATE_OPS[key]
+    rows = [op.row(change) for _, change in run]
+    await getattr(db, op.batch_method)(codebase, rows, session=session)
 
 
 # ===================================================================
@@ -795,34 +1021,27 @@ async def brocode_get_active_agents(
     codebase = codebase_name if codebase_name else None
     records = await db.get_active_agents(codebase)
 
-    # Group by agent for a cleaner response
-    agents: dict[str, dict] = {}
-    for rec in records:
-        name = rec["agent_name"]
-        if name not in agents:
-            agents[name] = {
-                "agent_name": name,
-                "agent_model": rec["agent_model"],
-                "claims": [],
-            }
-        # Extract primary node type from labels list
-        node_labels = rec.get("node_labels", [])
-        primary_type = next(
-            (l for l in node_labels if l in VALID_NODE_TYPES),
-            "Unknown",
-        )
-        agents[name]["claims"].append(
-            {
-                "node_path": rec["node_path"],
-                "node_type": primary_type,
-                "claim_reason": rec.get("claim_reason", ""),
-            }
-        )
+    # Claims arrive already grouped per agent, each with its node type.
+    agents = [
+        {
+            "agent_name": rec["agent_name"],
+            "agent_model": rec["agent_model"],
+            "claims": [
+                {
+                    "node_path": claim["node_path"],
+                    "node_type": claim["node_type"],
+                    "claim_reason": claim.get("claim_reason", ""),
+                }
+                for claim in rec["claims"]
+            ],
+        }
+        for rec in records
+    ]
 
     return {
         "status": "ok",
         "agent_count": len(agents),
-        "agents": list(agents.values()),
+        "agents": agents,
     }
 
 
@@ -845,6 +1064,7 @@ async def brocode_query_codebase(
     path_filter: str = "",
     node_type: str = "",
     limit: int = 50,
+    offset: int = 0,
     ctx: Context = None,
 ) -> dict:
     """Search the indexed codebase structure and see which nodes are claimed.
@@ -857,6 +1077,9 @@ async def brocode_query_codebase(
         path_filter: Optional glob pattern to filter paths (e.g. "src/*.py").
         node_type: Optional filter: "File", "Directory", "Codebase", "Class", or "Function".
         limit: Maximum results to return (default 50, max 200).
+        offset: Number of results to skip, for paging (default 0).
+            Results are sorted by path, so pass the previous offset plus
+            limit to get the next page.
 
     Returns:
         A dict with "nodes": list of matching nodes and their claim status.
@@ -869,40 +1092,37 @@ async def brocode_query_codebase(
             "status": "error",
             "message": (
                 f"Invalid node_type '{node_type}'. "
-                f"Must be one of: {', '.join(sorted(VALID_NODE_TYPES))}"
+                f"Must be one of: {_VALID_NODE_TYPES_DISPLAY}"
             ),
         }
 
-    # Clamp limit
+    # Clamp limit and offset
     limit = max(1, min(limit, 200))
+    offset = max(0, offset)
 
     records = await db.query_codebase(
         codebase=codebase_name,
         path_filter=path_filter if path_filter else None,
         node_type=node_type if node_type else None,
         limit=limit,
+        offset=offset,
     )
 
-    nodes = []
-    for rec in records:
-        node_labels = rec.get("node_labels", [])
-        primary_type = next(
-            (l for l in node_labels if l in VALID_NODE_TYPES),
-            "Unknown",
-        )
-        nodes.append(
-            {
-                "path": rec["node_path"],
-                "name": rec.get("node_name", ""),
-                "type": primary_type,
-                "claimed_by": rec.get("claimed_by"),
-                "claim_reason": rec.get("claim_reason"),
-            }
-        )
+    nodes = [
+        {
+            "path": rec["node_path"],
+            "name": rec.get("node_name", ""),
+            "type": rec.get("node_type", "Unknown"),
+            "claimed_by": rec.get("claimed_by"),
+            "claim_reason": rec.get("claim_reason"),
+        }
+        for rec in records
+    ]
 
     return {
         "status": "ok",
         "count": len(nodes),
+        "offset": offset,
         "codebase": codebase_name,
         "nodes": nodes,
     }
@@ -960,13 +1180,15 @@ async def brocode_send_message(
             "message": "Message content is required and cannot be empty.",
         }
 
+    not_found = {
+        "status": "error",
+        "message": f"Agent '{to_agent}' not found. Has it registered by claiming a node?",
+    }
+
     # Validate: target agent must exist
     agent = await db.check_agent_exists(to_agent)
     if agent is None:
-        return {
-            "status": "error",
-            "message": f"Agent '{to_agent}' not found. Has it registered by claiming a node?",
-        }
+        return not_found
 
     # Build the message payload
     msg_dict = {
@@ -975,11 +1197,14 @@ async def brocode_send_message(
         "node_path": node_path,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
-    msg_json = json.dumps(msg_dict)
+    msg_json = _json_dumps(msg_dict)
 
     result = await db.send_message(to_agent, msg_json)
     if result is None:
-        return {"status": "error", "message": "Failed to deliver message (unexpected)."}
+        # check_agent_exists() answered from its cache, but the agent has
+        # since been deleted (e.g. by another agent's server process).
+        return not_found
+    _notify_inbox(to_agent)
 
     logger.info(
         "Agent '%s' sent message to '%s' (re: '%s')",
@@ -991,6 +1216,7 @@ async def brocode_send_message(
         "status": "sent",
         "to_agent": to_agent,
         "message_count": result["message_count"],
+        "dropped": bool(result.get("dropped")),
     }
 
 
@@ -1010,16 +1236,23 @@ async def brocode_send_message(
 )
 async def brocode_get_messages(
     agent_name: str,
+    clear: bool = False,
+    await_ms: int = 0,
     ctx: Context = None,
 ) -> dict:
     """Retrieve messages for an agent.
 
     Call this periodically to check if other agents have sent you
     messages (e.g., requesting access to a node you've claimed).
-    Use brocode_clear_messages to delete messages after processing them.
+    Pass clear=True to empty the inbox atomically as part of the read;
+    otherwise use brocode_clear_messages after processing them.
+    Pass await_ms to wait for mail instead of polling in a tight loop.
 
     Args:
         agent_name: Your agent identifier.
+        clear: Also clear the returned messages, in the same transaction.
+        await_ms: If the inbox is empty, wait up to this many milliseconds
+            (max 30000) for a message before returning.
 
     Returns:
         A dict with "status", "messages" (list of parsed message dicts),
@@ -1027,13 +1260,14 @@ async def brocode_get_messages(
     """
     db: Neo4jClient = _get_db(ctx)
 
-    raw_messages = await db.get_messages(agent_name)
+    fetch = db.drain_messages if clear else db.get_messages
+    raw_messages = await _wait_for_messages(fetch, agent_name, await_ms)
 
     # Parse JSON strings back to dicts
     messages = []
     for raw in raw_messages:
         try:
-            messages.append(json.loads(raw))
+            messages.append(_json_loads(raw))
         except (json.JSONDecodeError, TypeError):
             # Tolerate malformed entries — include raw string as content
             messages.append(
@@ -1047,6 +1281,56 @@ async def brocode_get_messages(
     }
 
 
+# Long-polling for brocode_get_messages(await_ms=...). Each waiter registers
+# an Event under its agent name and brocode_send_message sets them after
+# delivering, so a message sent through this process wakes the reader at
+# once. Messages sent by other server processes (one per agent over stdio)
+# are only seen by re-reading Neo4j, so the wait also re-polls with
+# exponential backoff.
+_MAX_AWAIT_MS = 30_000
+_POLL_MIN_DELAY = 0.25
+_POLL_MAX_DELAY = 4.0
+_INBOX_WAITERS: dict[str, set[asyncio.Event]] = {}
+
+
+def _notify_inbox(agent_name: str) -> None:
+    """Wake any brocode_get_messages call waiting on *agent_name*'s inbox."""
+    for event in _INBOX_WAITERS.get(agent_name, ()):
+        event.set()
+
+
+async def _wait_for_messages(
+    fetch: Callable, agent_name: str, await_ms: int
+) -> list[str]:
+    """Fetch *agent_name*'s inbox, waiting up to *await_ms* for it to fill."""
+    if await_ms <= 0:
+        return await fetch(agent_name)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(await_ms, _MAX_AWAIT_MS) / 1000
+    delay = _POLL_MIN_DELAY
+    event = asyncio.Event()
+    waiters = _INBOX_WAITERS.setdefault(agent_name, set())
+    waiters.add(event)
+    try:
+        while True:
+            # Clear before reading so a send landing between the read and
+            # the wait still wakes us.
+            event.clear()
+            raw_messages = await fetch(agent_name)
+            remaining = deadline - loop.time()
+            if raw_messages or remaining <= 0:
+                return raw_messages
+            try:
+                await asyncio.wait_for(event.wait(), min(delay, remaining))
+            except asyncio.TimeoutError:
+                delay = min(delay * 2, _POLL_MAX_DELAY)
+    finally:
+        waiters.discard(event)
+        if not waiters and _INBOX_WAITERS.get(agent_name) is waiters:
+            del _INBOX_WAITERS[agent_name]
+
+
 # ===================================================================
 # Tool 7: brocode_clear_messages
 # ===================================================================
@@ -17,23 +17,24 @@ import pytest
 
 
 @pytest.fixture
-def mock_db() -> AsyncMock:
+def mock_session() -> AsyncMock:
+    """Stand-in for the neo4j session yielded by Neo4jClient.session()."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_db(mock_session: AsyncMock) -> AsyncMock:
     """Create a mock Neo4jClient with all async methods stubbed.
 
     Default behavior: node exists, no existing claims, claim succeeds.
     Override return values in individual tests to simulate different scenarios.
     """
     db = AsyncMock()
-    db.check_node_exists.return_value = {
-        "labels": ["File"],
-        "path": "src/app.py",
-        "name": "app.py",
-    }
-    db.check_existing_claim.return_value = []
-    db.create_claim.return_value = {
+    db.claim_node.return_value = {
+        "status": "claimed",
         "labels": ["File"],
         "path": "src/app.py",
-        "name": "app.py",
+        "claims": [],
     }
     db.release_claim.return_value = {
         "agent_name": "claude-1",
@@ -44,9 +45,10 @@ def mock_db() -> AsyncMock:
     db.query_codebase.return_value = []
     # Messaging defaults
     db.check_agent_exists.return_value = {"name": "gemini-1", "model": "gemini"}
-    db.send_message.return_value = {"message_count": 1}
+    db.send_message.return_value = {"message_count": 1, "dropped": False}
     db.get_messages.return_value = []
     db.clear_messages.return_value = None
+    db.drain_messages.return_value = []
     # Agent cleanup defaults
     db.count_agent_claims.return_value = 0
     db.delete_agent.return_value = None
@@ -59,6 +61,9 @@ def mock_db() -> AsyncMock:
     db.delete_directory.return_value = None
     db.delete_function.return_value = None
     db.delete_class.return_value = None
+    # db.session() is a sync call returning an async context manager
+    db.session = MagicMock()
+    db.session.return_value.__aenter__.return_value = mock_session
     return db
 
 
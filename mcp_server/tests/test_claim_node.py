@@ -30,14 +30,18 @@ async def test_claim_existing_node_success(mock_db, mock_ctx):
     assert result["status"] == "claimed"
     assert result["node_path"] == "src/app.py"
     assert result["agent_name"] == "claude-1"
-    mock_db.check_node_exists.assert_awaited_once_with("src/app.py", "my-repo")
-    mock_db.create_claim.assert_awaited_once()
+    mock_db.claim_node.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_claim_nonexistent_node(mock_db, mock_ctx):
     """Claiming a node that doesn't exist in the graph should return error."""
-    mock_db.check_node_exists.return_value = None
+    mock_db.claim_node.return_value = {
+        "status": "not_found",
+        "labels": None,
+        "path": None,
+        "claims": [],
+    }
 
     result = await claim_node(
         agent_name="claude-1",
@@ -50,13 +54,14 @@ async def test_claim_nonexistent_node(mock_db, mock_ctx):
 
     assert result["status"] == "error"
     assert "not found" in result["message"].lower()
-    mock_db.create_claim.assert_not_awaited()
+    mock_db.claim_node.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_claim_already_yours_is_idempotent(mock_db, mock_ctx):
     """Re-claiming a node you already own should return 'already_yours'."""
-    mock_db.check_existing_claim.return_value = [
+    mock_db.claim_node.return_value["status"] = "already_yours"
+    mock_db.claim_node.return_value["claims"] = [
         {"agent_name": "claude-1", "agent_model": "claude", "claim_reason": "Updating input validation"}
     ]
 
@@ -70,13 +75,14 @@ async def test_claim_already_yours_is_idempotent(mock_db, mock_ctx):
     )
 
     assert result["status"] == "already_yours"
-    mock_db.create_claim.assert_not_awaited()
+    mock_db.claim_node.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_claim_conflict_another_agent(mock_db, mock_ctx):
     """Claiming a node held by another agent should return 'conflict'."""
-    mock_db.check_existing_claim.return_value = [
+    mock_db.claim_node.return_value["status"] = "conflict"
+    mock_db.claim_node.return_value["claims"] = [
         {"agent_name": "gemini-1", "agent_model": "gemini", "claim_reason": "Fixing authentication bug"}
     ]
 
@@ -92,12 +98,12 @@ async def test_claim_conflict_another_agent(mock_db, mock_ctx):
     assert result["status"] == "conflict"
     assert "gemini-1" in result["message"]
     assert result["claimed_by"] == "gemini-1"
-    mock_db.create_claim.assert_not_awaited()
+    mock_db.claim_node.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 async def test_claim_accepts_descriptive_reason(mock_db, mock_ctx):
-    """Free-text descriptive claim reason should be passed through to create_claim."""
+    """Free-text descriptive claim reason should be passed through to claim_node."""
     await claim_node(
         agent_name="claude-1",
         agent_model="claude",
@@ -107,7 +113,7 @@ async def test_claim_accepts_descriptive_reason(mock_db, mock_ctx):
         ctx=mock_ctx,
     )
 
-    mock_db.create_claim.assert_awaited_once_with(
+    mock_db.claim_node.assert_awaited_once_with(
         "claude-1", "claude", "src/app.py", "my-repo",
         "Changes to input parameters and return statement"
     )
@@ -127,8 +133,7 @@ async def test_claim_rejects_empty_reason(mock_db, mock_ctx):
 
     assert result["status"] == "error"
     assert "claim_reason is required" in result["message"]
-    mock_db.check_node_exists.assert_not_awaited()
-    mock_db.create_claim.assert_not_awaited()
+    mock_db.claim_node.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -145,22 +150,17 @@ async def test_claim_rejects_whitespace_only_reason(mock_db, mock_ctx):
 
     assert result["status"] == "error"
     assert "claim_reason is required" in result["message"]
-    mock_db.check_node_exists.assert_not_awaited()
-    mock_db.create_claim.assert_not_awaited()
+    mock_db.claim_node.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 async def test_claim_directory_node(mock_db, mock_ctx):
     """Claiming a Directory node should work the same as claiming a File."""
-    mock_db.check_node_exists.return_value = {
-        "labels": ["Directory"],
-        "path": "src/utils",
-        "name": "utils",
-    }
-    mock_db.create_claim.return_value = {
+    mock_db.claim_node.return_value = {
+        "status": "claimed",
         "labels": ["Directory"],
         "path": "src/utils",
-        "name": "utils",
+        "claims": [],
     }
 
     result = await claim_node(
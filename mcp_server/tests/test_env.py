@@ -0,0 +1,111 @@
+"""Tests for .env loading and Neo4j config (brocode_mcp.env).
+
+Covers: the KEY=value parser (comments, blanks, whitespace, CRLF,
+duplicate and non-identifier keys), environment variables taking
+precedence over .env, the once-per-process guard, and load_neo4j_config
+reading the current environment.
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from brocode_mcp import env
+
+
+@pytest.fixture(autouse=True)
+def fresh_env(monkeypatch, tmp_path):
+    """Run each test in an empty cwd, with the guard reset and a scratch environ.
+
+    os.environ is swapped for a copy without NEO4J_* variables, so whatever
+    the .env loader writes is discarded after the test.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(env, "_DOTENV_LOADED", False)
+    scratch = {k: v for k, v in os.environ.items() if not k.startswith("NEO4J_")}
+    monkeypatch.setattr(os, "environ", scratch)
+
+
+def test_apply_dotenv_parses_assignments(tmp_path):
+    """Comments and blank lines are skipped; keys and values are trimmed."""
+    path = tmp_path / ".env"
+    path.write_bytes(
+        b"# comment\n"
+        b"\n"
+        b"BROCODE_TEST_A=one\n"
+        b"  BROCODE_TEST_B = two words  \r\n"
+        b"not an assignment\n"
+        b"BROCODE_TEST_C=\n"
+    )
+
+    env._apply_dotenv(path)
+
+    assert os.environ["BROCODE_TEST_A"] == "one"
+    assert os.environ["BROCODE_TEST_B"] == "two words"
+    assert os.environ["BROCODE_TEST_C"] == ""
+    assert "not an assignment" not in os.environ
+
+
+def test_apply_dotenv_first_duplicate_wins(tmp_path):
+    """A key repeated in .env keeps the value of its first occurrence."""
+    path = tmp_path / ".env"
+    path.write_text("BROCODE_TEST_A=first\nBROCODE_TEST_A=second\n")
+
+    env._apply_dotenv(path)
+
+    assert os.environ["BROCODE_TEST_A"] == "first"
+
+
+def test_apply_dotenv_keeps_non_identifier_keys(tmp_path):
+    """The key is everything before '=', even if it isn't an identifier."""
+    path = tmp_path / ".env"
+    path.write_text("export BROCODE_TEST_A=bar\n")
+
+    env._apply_dotenv(path)
+
+    assert os.environ["export BROCODE_TEST_A"] == "bar"
+
+
+def test_apply_dotenv_keeps_existing_variables(tmp_path):
+    """Variables already in the environment win over .env."""
+    os.environ["BROCODE_TEST_A"] = "from-env"
+    path = tmp_path / ".env"
+    path.write_text("BROCODE_TEST_A=from-file\n")
+
+    env._apply_dotenv(path)
+
+    assert os.environ["BROCODE_TEST_A"] == "from-env"
+
+
+def test_apply_dotenv_missing_file_is_ignored(tmp_path):
+    """A missing .env is not an error."""
+    env._apply_dotenv(tmp_path / ".env")
+
+
+def test_load_dotenv_runs_once(tmp_path):
+    """The .env file is applied on the first call only."""
+    (tmp_path / ".env").write_text("BROCODE_TEST_A=first\n")
+    env._load_dotenv()
+    del os.environ["BROCODE_TEST_A"]
+
+    env._load_dotenv()
+
+    assert "BROCODE_TEST_A" not in os.environ
+    assert env._DOTENV_LOADED is True
+
+
+def test_load_neo4j_config_reads_current_environment(tmp_path):
+    """Config comes from .env on first load and follows later env changes."""
+    (tmp_path / ".env").write_text(
+        "NEO4J_URI=bolt://db:7687\nNEO4J_MAX_POOL_SIZE=20\n"
+    )
+
+    config = env.load_neo4j_config()
+    assert config.uri == "bolt://db:7687"
+    assert config.max_connection_pool_size == 20
+    assert config.database == "neo4j"
+
+    os.environ["NEO4J_DATABASE"] = "other"
+    assert env.load_neo4j_config().database == "other"
@@ -31,23 +31,23 @@ async def test_single_agent_multiple_claims(mock_db, mock_ctx):
         {
             "agent_name": "claude-1",
             "agent_model": "claude",
-            "node_labels": ["File"],
-            "node_path": "src/app.py",
-            "claim_reason": "editing",
-        },
-        {
-            "agent_name": "claude-1",
-            "agent_model": "claude",
-            "node_labels": ["File"],
-            "node_path": "src/utils.py",
-            "claim_reason": "refactoring",
-        },
-        {
-            "agent_name": "claude-1",
-            "agent_model": "claude",
-            "node_labels": ["Directory"],
-            "node_path": "src/models",
-            "claim_reason": "",
+            "claims": [
+                {
+                    "node_type": "File",
+                    "node_path": "src/app.py",
+                    "claim_reason": "editing",
+                },
+                {
+                    "node_type": "File",
+                    "node_path": "src/utils.py",
+                    "claim_reason": "refactoring",
+                },
+                {
+                    "node_type": "Directory",
+                    "node_path": "src/models",
+                    "claim_reason": "",
+                },
+            ],
         },
     ]
 
@@ -57,6 +57,7 @@ async def test_single_agent_multiple_claims(mock_db, mock_ctx):
     agent = result["agents"][0]
     assert agent["agent_name"] == "claude-1"
     assert len(agent["claims"]) == 3
+    assert [c["node_type"] for c in agent["claims"]] == ["File", "File", "Directory"]
 
 
 @pytest.mark.asyncio
@@ -66,16 +67,24 @@ async def test_multiple_agents(mock_db, mock_ctx):
         {
             "agent_name": "claude-1",
             "agent_model": "claude",
-            "node_labels": ["File"],
-            "node_path": "src/app.py",
-            "claim_reason": "",
+            "claims": [
+                {
+                    "node_type": "File",
+                    "node_path": "src/app.py",
+                    "claim_reason": "",
+                },
+            ],
         },
         {
             "agent_name": "gemini-1",
             "agent_model": "gemini",
-            "node_labels": ["Directory"],
-            "node_path": "src/db",
-            "claim_reason": "schema migration",
+            "claims": [
+                {
+                    "node_type": "Directory",
+                    "node_path": "src/db",
+                    "claim_reason": "schema migration",
+                },
+            ],
         },
     ]
 
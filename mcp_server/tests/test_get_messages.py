@@ -1,19 +1,23 @@
 """Tests for the brocode_get_messages tool.
 
-Covers: retrieving parsed messages, empty inbox. Messages are read-only —
-clearing is done via a separate brocode_clear_messages tool.
+Covers: retrieving parsed messages, empty inbox. Messages are read-only
+by default; clear=True drains the inbox atomically instead. await_ms
+waits for mail, woken by brocode_send_message or by re-polling.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 
 import pytest
 
 from brocode_mcp.server import brocode_get_messages as _tool
+from brocode_mcp.server import brocode_send_message as _send_tool
 
 # Access the underlying async function, bypassing FastMCP's FunctionTool wrapper.
 get_messages = _tool.fn
+send_message = _send_tool.fn
 
 
 @pytest.mark.asyncio
@@ -79,3 +83,60 @@ async def test_get_messages_does_not_clear(mock_db, mock_ctx):
     )
 
     mock_db.clear_messages.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_messages_clear_drains_atomically(mock_db, mock_ctx):
+    """clear=True should read and clear in one drain call, not get + clear."""
+    mock_db.drain_messages.return_value = [
+        json.dumps({"from": "gemini-1", "content": "Hello", "node_path": "", "timestamp": "2026-02-07T12:30:00Z"}),
+    ]
+
+    result = await get_messages(
+        agent_name="claude-1",
+        clear=True,
+        ctx=mock_ctx,
+    )
+
+    assert result["count"] == 1
+    assert result["messages"][0]["from"] == "gemini-1"
+    mock_db.drain_messages.assert_awaited_once_with("claude-1")
+    mock_db.get_messages.assert_not_awaited()
+    mock_db.clear_messages.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_messages_await_times_out_on_empty_inbox(mock_db, mock_ctx):
+    """With await_ms and no mail, the call returns an empty inbox after the wait."""
+    result = await get_messages(
+        agent_name="claude-1",
+        await_ms=50,
+        ctx=mock_ctx,
+    )
+
+    assert result["count"] == 0
+    assert mock_db.get_messages.await_count >= 2
+
+
+@pytest.mark.asyncio
+async def test_get_messages_await_wakes_on_send(mock_db, mock_ctx):
+    """A send_message to a waiting agent should end the wait immediately."""
+    message = json.dumps({"from": "gemini-1", "content": "Hello", "node_path": "", "timestamp": "2026-02-07T12:30:00Z"})
+    mock_db.get_messages.side_effect = [[], [message]]
+
+    waiter = asyncio.create_task(get_messages(
+        agent_name="claude-1",
+        await_ms=10_000,
+        ctx=mock_ctx,
+    ))
+    await asyncio.sleep(0)
+    await send_message(
+        from_agent="gemini-1",
+        to_agent="claude-1",
+        message="Hello",
+        ctx=mock_ctx,
+    )
+    result = await asyncio.wait_for(waiter, timeout=1)
+
+    assert result["count"] == 1
+    assert mock_db.get_messages.await_count == 2
@@ -0,0 +1,76 @@
+"""Tests for the glob helpers behind brocode_query_codebase's path_filter.
+
+Covers: _glob_to_regex agreeing with fnmatch on wildcards, character
+classes, negation, literal hyphens and brackets, reversed (empty) ranges,
+and the match-everything shortcut; _glob_prefix extracting the literal
+prefix used for the STARTS WITH pre-filter.
+
+The regexes are written for Neo4j's Java engine, but the constructs used
+are read the same way by Python's re, so fnmatch is the reference here.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+
+import pytest
+
+from brocode_mcp.neo4j_client import _glob_prefix, _glob_to_regex
+
+PATHS = [
+    "src/app.py", "src/util.py", "src/a.txt", "src/b.py", "src/z.py",
+    "src/-.py", "src/].py", "src/^.py", "src/&.py", "README.md",
+    "docs/x-y.md", "src/sub/deep.py",
+]
+
+
+@pytest.mark.parametrize("pattern", [
+    "src/*.py",
+    "src/?.py",
+    "*.md",
+    "src/[ab].py",
+    "src/[!ab].py",
+    "src/[a-c].py",
+    "src/[-a].py",
+    "src/[a-].py",
+    "src/[]].py",
+    "src/[!]].py",
+    "src/[\\^&].py",
+    "src/[z-a].py",
+    "src/[!z-a].py",
+    "src/[z-ab].py",
+    "src/[a-cz-a].py",
+    "docs/x[-]y.md",
+    "src/[.py",
+])
+def test_glob_to_regex_matches_like_fnmatch(pattern):
+    """Every path should match the regex exactly when fnmatch matches."""
+    regex = re.compile(_glob_to_regex(pattern))
+    for path in PATHS:
+        assert bool(regex.fullmatch(path)) == fnmatch.fnmatchcase(path, pattern), path
+
+
+def test_glob_to_regex_reversed_range_is_valid():
+    """A reversed range must not be copied through; Neo4j rejects [z-a]."""
+    assert "z-a" not in _glob_to_regex("src/[z-a].py")
+    assert _glob_to_regex("[z-a]") == "(?s)(?!)"
+    assert _glob_to_regex("[!z-a]") == "(?s)."
+
+
+@pytest.mark.parametrize("pattern", ["*", "**", "***"])
+def test_glob_to_regex_match_all_returns_none(pattern):
+    """Globs that match everything need no regex at all."""
+    assert _glob_to_regex(pattern) is None
+
+
+@pytest.mark.parametrize("pattern, prefix", [
+    ("src/*.py", "src/"),
+    ("src/app.py", "src/app.py"),
+    ("src/a?.py", "src/a"),
+    ("src/[ab].py", "src/"),
+    ("*", ""),
+])
+def test_glob_prefix(pattern, prefix):
+    """The prefix is everything before the first wildcard."""
+    assert _glob_prefix(pattern) == prefix
@@ -0,0 +1,127 @@
+"""Tests for the server lifespan (app_lifespan).
+
+Covers: schema bootstrap and plan warm-up are best-effort — a driver or
+server error during startup is logged and the server still comes up; the
+bootstrap is bounded by a timeout; warm-up runs in the background and is
+awaited after cancellation on shutdown; the client is built from the
+lifespan's own config; _get_db() returns the lifespan client (_DB) while it
+is set and falls back to the request context otherwise.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from unittest.mock import AsyncMock
+
+import pytest
+from neo4j.exceptions import ClientError, ServiceUnavailable
+
+from brocode_mcp import server
+
+
+@pytest.fixture
+def lifespan_db(mock_db, monkeypatch) -> AsyncMock:
+    """Patch the client factory so app_lifespan uses mock_db."""
+    monkeypatch.setattr(server, "get_client", AsyncMock(return_value=mock_db))
+    monkeypatch.setattr(server, "close_client", AsyncMock())
+    return mock_db
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("exc", [
+    ServiceUnavailable("Neo4j is down"),
+    ClientError("Permission denied"),
+])
+async def test_lifespan_survives_startup_errors(lifespan_db, exc):
+    """A failing schema bootstrap should not abort server startup."""
+    lifespan_db.bootstrap_schema.side_effect = exc
+
+    async with server.app_lifespan(server.mcp) as context:
+        assert context == {"db": lifespan_db}
+
+    lifespan_db.warm_query_plans.assert_not_awaited()
+    server.close_client.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_plans_in_background(lifespan_db):
+    """Plan warm-up runs after startup, and its failure is only logged."""
+    lifespan_db.warm_query_plans.side_effect = ServiceUnavailable("down")
+
+    async with server.app_lifespan(server.mcp):
+        lifespan_db.warm_query_plans.assert_not_awaited()
+        await asyncio.sleep(0)
+        lifespan_db.warm_query_plans.assert_awaited_once()
+        lifespan_db.warm_page_cache.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_builds_client_from_loaded_config(lifespan_db):
+    """The client is created from the config the lifespan already loaded."""
+    async with server.app_lifespan(server.mcp):
+        pass
+
+    (config,), _ = server.get_client.call_args
+    assert config == server.load_neo4j_config()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_bounds_schema_bootstrap(lifespan_db, monkeypatch):
+    """A bootstrap that hangs (e.g. Neo4j unreachable) must not stall startup."""
+    async def hang() -> None:
+        await asyncio.sleep(60)
+
+    lifespan_db.bootstrap_schema.side_effect = hang
+    monkeypatch.setattr(server, "SCHEMA_BOOTSTRAP_TIMEOUT", 0.01)
+
+    async with server.app_lifespan(server.mcp) as context:
+        assert context == {"db": lifespan_db}
+
+    lifespan_db.warm_query_plans.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_waits_for_cancelled_warm_up(lifespan_db):
+    """Shutdown cancels a running warm-up and waits for it before closing."""
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow_warm_up() -> None:
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    lifespan_db.warm_page_cache.side_effect = slow_warm_up
+
+    async with server.app_lifespan(server.mcp):
+        await started.wait()
+
+    assert cancelled.is_set()
+    server.close_client.assert_awaited_once()
+
+
+def test_get_db_prefers_lifespan_client(mock_db, monkeypatch):
+    """While the lifespan is running, _get_db() returns its client directly."""
+    monkeypatch.setattr(server, "_DB", mock_db)
+
+    assert server._get_db(None) is mock_db
+
+
+def test_get_db_falls_back_to_context(mock_db, mock_ctx, monkeypatch):
+    """Without a lifespan client, _get_db() reads the request context."""
+    monkeypatch.setattr(server, "_DB", None)
+
+    assert server._get_db(mock_ctx) is mock_db
+
+
+@pytest.mark.asyncio
+async def test_lifespan_sets_and_clears_db(lifespan_db):
+    """app_lifespan publishes its client as _DB and clears it on shutdown."""
+    async with server.app_lifespan(server.mcp):
+        assert server._get_db(None) is lifespan_db
+
+    assert server._DB is None
@@ -1,7 +1,7 @@
 """Tests for the brocode_query_codebase tool.
 
 Covers: unfiltered query, type filter, path glob filter, invalid type,
-claim status in results, and limit enforcement.
+claim status in results, limit enforcement, and offset paging.
 """
 
 from __future__ import annotations
@@ -19,14 +19,14 @@ async def test_query_all_nodes(mock_db, mock_ctx):
     """Query with no filters should return matching nodes."""
     mock_db.query_codebase.return_value = [
         {
-            "node_labels": ["File"],
+            "node_type": "File",
             "node_path": "src/app.py",
             "node_name": "app.py",
             "claimed_by": None,
             "claim_reason": None,
         },
         {
-            "node_labels": ["Directory"],
+            "node_type": "Directory",
             "node_path": "src",
             "node_name": "src",
             "claimed_by": None,
@@ -46,7 +46,7 @@ async def test_query_filter_by_type(mock_db, mock_ctx):
     """Filtering by node_type should pass through to the client."""
     mock_db.query_codebase.return_value = [
         {
-            "node_labels": ["File"],
+            "node_type": "File",
             "node_path": "src/app.py",
             "node_name": "app.py",
             "claimed_by": None,
@@ -60,7 +60,7 @@ async def test_query_filter_by_type(mock_db, mock_ctx):
 
     assert result["status"] == "ok"
     mock_db.query_codebase.assert_awaited_once_with(
-        codebase="my-repo", path_filter=None, node_type="File", limit=50
+        codebase="my-repo", path_filter=None, node_type="File", limit=50, offset=0
     )
 
 
@@ -75,7 +75,7 @@ async def test_query_filter_by_path_glob(mock_db, mock_ctx):
 
     assert result["status"] == "ok"
     mock_db.query_codebase.assert_awaited_once_with(
-        codebase="my-repo", path_filter="src/*.py", node_type=None, limit=50
+        codebase="my-repo", path_filter="src/*.py", node_type=None, limit=50, offset=0
     )
 
 
@@ -96,14 +96,14 @@ async def test_query_shows_claim_status(mock_db, mock_ctx):
     """Nodes with active claims should show claimed_by in results."""
     mock_db.query_codebase.return_value = [
         {
-            "node_labels": ["File"],
+            "node_type": "File",
             "node_path": "src/app.py",
             "node_name": "app.py",
             "claimed_by": "claude-1",
             "claim_reason": "editing",
         },
         {
-            "node_labels": ["File"],
+            "node_type": "File",
             "node_path": "src/utils.py",
             "node_name": "utils.py",
             "claimed_by": None,
@@ -130,5 +130,26 @@ async def test_query_respects_limit(mock_db, mock_ctx):
     )
 
     mock_db.query_codebase.assert_awaited_once_with(
-        codebase="my-repo", path_filter=None, node_type=None, limit=5
+        codebase="my-repo", path_filter=None, node_type=None, limit=5, offset=0
     )
+
+
+@pytest.mark.asyncio
+async def test_query_offset_is_passed_and_clamped(mock_db, mock_ctx):
+    """offset should reach the client, with negative values clamped to 0."""
+    mock_db.query_codebase.return_value = []
+
+    result = await query_codebase(
+        codebase_name="my-repo", offset=100, ctx=mock_ctx
+    )
+    assert result["offset"] == 100
+    mock_db.query_codebase.assert_awaited_once_with(
+        codebase="my-repo", path_filter=None, node_type=None, limit=50, offset=100
+    )
+
+    mock_db.query_codebase.reset_mock()
+    result = await query_codebase(
+        codebase_name="my-repo", offset=-5, ctx=mock_ctx
+    )
+    assert result["offset"] == 0
+    assert mock_db.query_codebase.await_args.kwargs["offset"] == 0
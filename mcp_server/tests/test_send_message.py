@@ -1,7 +1,9 @@
 """Tests for the brocode_send_message tool.
 
 Covers: successful send, empty message rejected, self-send rejected,
-nonexistent target rejected, optional node_path handling.
+nonexistent target rejected, target deleted before delivery, optional
+node_path handling, inbox cap, content orjson cannot encode (sent and read
+back).
 """
 
 from __future__ import annotations
@@ -10,10 +12,12 @@ import json
 
 import pytest
 
+from brocode_mcp.server import brocode_get_messages as _get_tool
 from brocode_mcp.server import brocode_send_message as _tool
 
 # Access the underlying async function, bypassing FastMCP's FunctionTool wrapper.
 send_message = _tool.fn
+get_messages = _get_tool.fn
 
 
 @pytest.mark.asyncio
@@ -119,3 +123,69 @@ async def test_send_message_without_node_path(mock_db, mock_ctx):
     stored_json = call_args[0][1]
     stored = json.loads(stored_json)
     assert stored["node_path"] == ""
+
+
+@pytest.mark.asyncio
+async def test_send_message_reports_dropped_when_inbox_full(mock_db, mock_ctx):
+    """A full inbox drops its oldest message; the response should say so."""
+    mock_db.send_message.return_value = {"message_count": 1000, "dropped": True}
+
+    result = await send_message(
+        from_agent="claude-1",
+        to_agent="gemini-1",
+        message="Are you still working on src/app.py?",
+        ctx=mock_ctx,
+    )
+
+    assert result["status"] == "sent"
+    assert result["message_count"] == 1000
+    assert result["dropped"] is True
+
+
+@pytest.mark.asyncio
+async def test_send_message_reports_not_found_when_agent_deleted(mock_db, mock_ctx):
+    """A cached agent deleted before delivery should be reported as not found."""
+    mock_db.send_message.return_value = None
+
+    result = await send_message(
+        from_agent="claude-1",
+        to_agent="gemini-1",
+        message="Are you still working on src/app.py?",
+        ctx=mock_ctx,
+    )
+
+    assert result["status"] == "error"
+    assert "not found" in result["message"].lower()
+
+
+@pytest.mark.asyncio
+async def test_send_message_accepts_lone_surrogates(mock_db, mock_ctx):
+    """Content json.dumps can encode is sent even if orjson rejects it."""
+    result = await send_message(
+        from_agent="claude-1",
+        to_agent="gemini-1",
+        message="broken \ud800 text",
+        ctx=mock_ctx,
+    )
+
+    assert result["status"] == "sent"
+    stored = json.loads(mock_db.send_message.call_args[0][1])
+    assert stored["content"] == "broken \ud800 text"
+
+
+@pytest.mark.asyncio
+async def test_send_message_lone_surrogates_round_trip(mock_db, mock_ctx):
+    """A message orjson cannot encode is read back with sender and content."""
+    await send_message(
+        from_agent="claude-1",
+        to_agent="gemini-1",
+        message="broken \ud800 text",
+        ctx=mock_ctx,
+    )
+    mock_db.get_messages.return_value = [mock_db.send_message.call_args[0][1]]
+
+    result = await get_messages(agent_name="gemini-1", ctx=mock_ctx)
+
+    assert result["count"] == 1
+    assert result["messages"][0]["from"] == "claude-1"
+    assert result["messages"][0]["content"] == "broken \ud800 text"
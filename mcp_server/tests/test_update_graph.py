@@ -183,7 +183,7 @@ async def test_missing_class_name_for_class_upsert(mock_db, mock_ctx):
 
 
 @pytest.mark.asyncio
-async def test_upsert_file(mock_db, mock_ctx):
+async def test_upsert_file(mock_db, mock_ctx, mock_session):
     """Upsert File should call db.upsert_file with correct args."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -205,11 +205,12 @@ async def test_upsert_file(mock_db, mock_ctx):
         extension=".py",
         size_bytes=1024,
         parent_path="src",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_file_defaults(mock_db, mock_ctx):
+async def test_upsert_file_defaults(mock_db, mock_ctx, mock_session):
     """Upsert File with only 'path' should derive name, extension, and default size_bytes=0."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -228,11 +229,12 @@ async def test_upsert_file_defaults(mock_db, mock_ctx):
         extension=".md",
         size_bytes=0,
         parent_path="",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_file_explicit_name(mock_db, mock_ctx):
+async def test_upsert_file_explicit_name(mock_db, mock_ctx, mock_session):
     """Upsert File with explicit name should use that instead of deriving."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -252,11 +254,12 @@ async def test_upsert_file_explicit_name(mock_db, mock_ctx):
         extension=".py",
         size_bytes=0,
         parent_path="",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_directory(mock_db, mock_ctx):
+async def test_upsert_directory(mock_db, mock_ctx, mock_session):
     """Upsert Directory should call db.upsert_directory with correct args."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -276,11 +279,12 @@ async def test_upsert_directory(mock_db, mock_ctx):
         name="utils",
         depth=2,
         parent_path="src",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_directory_defaults(mock_db, mock_ctx):
+async def test_upsert_directory_defaults(mock_db, mock_ctx, mock_session):
     """Upsert Directory with only 'path' should derive name and default depth=0."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -298,11 +302,12 @@ async def test_upsert_directory_defaults(mock_db, mock_ctx):
         name="src",
         depth=0,
         parent_path="",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_function(mock_db, mock_ctx):
+async def test_upsert_function(mock_db, mock_ctx, mock_session):
     """Upsert Function should call db.upsert_function with correct args."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -327,11 +332,12 @@ async def test_upsert_function(mock_db, mock_ctx):
         is_method=False,
         parameters="self, x: int",
         owner_class="",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_function_defaults(mock_db, mock_ctx):
+async def test_upsert_function_defaults(mock_db, mock_ctx, mock_session):
     """Upsert Function with minimal fields should use defaults."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -352,11 +358,12 @@ async def test_upsert_function_defaults(mock_db, mock_ctx):
         is_method=False,
         parameters="",
         owner_class="",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_class(mock_db, mock_ctx):
+async def test_upsert_class(mock_db, mock_ctx, mock_session):
     """Upsert Class should call db.upsert_class with correct args."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -377,11 +384,12 @@ async def test_upsert_class(mock_db, mock_ctx):
         name="User",
         line_number=5,
         base_classes="BaseModel, Mixin",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_upsert_class_defaults(mock_db, mock_ctx):
+async def test_upsert_class_defaults(mock_db, mock_ctx, mock_session):
     """Upsert Class with minimal fields should use defaults."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -400,6 +408,7 @@ async def test_upsert_class_defaults(mock_db, mock_ctx):
         name="User",
         line_number=0,
         base_classes="",
+        session=mock_session,
     )
 
 
@@ -409,7 +418,7 @@ async def test_upsert_class_defaults(mock_db, mock_ctx):
 
 
 @pytest.mark.asyncio
-async def test_delete_file(mock_db, mock_ctx):
+async def test_delete_file(mock_db, mock_ctx, mock_session):
     """Delete File should call db.delete_file."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -418,11 +427,13 @@ async def test_delete_file(mock_db, mock_ctx):
     )
     assert result["status"] == "ok"
     assert result["applied"] == 1
-    mock_db.delete_file.assert_awaited_once_with(path="src/old.py", codebase="my-repo")
+    mock_db.delete_file.assert_awaited_once_with(
+        path="src/old.py", codebase="my-repo", session=mock_session
+    )
 
 
 @pytest.mark.asyncio
-async def test_delete_directory(mock_db, mock_ctx):
+async def test_delete_directory(mock_db, mock_ctx, mock_session):
     """Delete Directory should call db.delete_directory."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -431,12 +442,12 @@ async def test_delete_directory(mock_db, mock_ctx):
     )
     assert result["status"] == "ok"
     mock_db.delete_directory.assert_awaited_once_with(
-        path="src/old", codebase="my-repo"
+        path="src/old", codebase="my-repo", session=mock_session
     )
 
 
 @pytest.mark.asyncio
-async def test_delete_function(mock_db, mock_ctx):
+async def test_delete_function(mock_db, mock_ctx, mock_session):
     """Delete Function should call db.delete_function."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -450,12 +461,13 @@ async def test_delete_function(mock_db, mock_ctx):
     )
     assert result["status"] == "ok"
     mock_db.delete_function.assert_awaited_once_with(
-        file_path="src/app.py", name="old_func", codebase="my-repo"
+        file_path="src/app.py", name="old_func", codebase="my-repo",
+        session=mock_session,
     )
 
 
 @pytest.mark.asyncio
-async def test_delete_class(mock_db, mock_ctx):
+async def test_delete_class(mock_db, mock_ctx, mock_session):
     """Delete Class should call db.delete_class."""
     result = await update_graph(
         codebase_name="my-repo",
@@ -469,7 +481,8 @@ async def test_delete_class(mock_db, mock_ctx):
     )
     assert result["status"] == "ok"
     mock_db.delete_class.assert_awaited_once_with(
-        file_path="src/models.py", name="OldModel", codebase="my-repo"
+        file_path="src/models.py", name="OldModel", codebase="my-repo",
+        session=mock_session,
     )
 
 
@@ -495,9 +508,59 @@ async def test_batch_all_succeed(mock_db, mock_ctx):
     assert result["errors"] == []
 
 
+@pytest.mark.asyncio
+async def test_batch_reuses_one_session(mock_db, mock_ctx, mock_session):
+    """All changes in a batch should share a single DB session."""
+    await update_graph(
+        codebase_name="my-repo",
+        changes=[
+            {"action": "upsert", "node_type": "Directory", "path": "src"},
+            {"action": "upsert", "node_type": "File", "path": "src/a.py"},
+            {"action": "delete", "node_type": "File", "path": "src/c.py"},
+        ],
+        ctx=mock_ctx,
+    )
+    mock_db.session.assert_called_once()
+    assert mock_db.upsert_file.await_args.kwargs["session"] is mock_session
+    assert mock_db.delete_file.await_args.kwargs["session"] is mock_session
+
+
+@pytest.mark.asyncio
+async def test_batch_groups_consecutive_changes(mock_db, mock_ctx, mock_session):
+    """Runs of the same (action, node_type) should go out as one batch call."""
+    result = await update_graph(
+        codebase_name="my-repo",
+        changes=[
+            {"action": "upsert", "node_type": "File", "path": "src/a.py"},
+            {"action": "upsert", "node_type": "File", "path": "src/b.py", "size_bytes": 7},
+            {"action": "delete", "node_type": "Function",
+             "file_path": "src/a.py", "function_name": "old"},
+        ],
+        ctx=mock_ctx,
+    )
+    assert result["status"] == "ok"
+    assert result["applied"] == 3
+    mock_db.upsert_files_batch.assert_awaited_once_with(
+        "my-repo",
+        [
+            {"path": "src/a.py", "name": "a.py", "extension": ".py",
+             "size_bytes": 0, "parent_path": ""},
+            {"path": "src/b.py", "name": "b.py", "extension": ".py",
+             "size_bytes": 7, "parent_path": ""},
+        ],
+        session=mock_session,
+    )
+    mock_db.upsert_file.assert_not_awaited()
+    mock_db.delete_function.assert_awaited_once_with(
+        file_path="src/a.py", name="old", codebase="my-repo",
+        session=mock_session,
+    )
+
+
 @pytest.mark.asyncio
 async def test_batch_partial_failure(mock_db, mock_ctx):
-    """A mix of valid and invalid changes should apply valid ones and report errors."""
+    """A failing batch is retried per change; only the bad change is reported."""
+    mock_db.upsert_files_batch.side_effect = Exception("DB error")
     mock_db.upsert_file.side_effect = [None, Exception("DB error")]
 
     result = await update_graph(
@@ -517,6 +580,7 @@ async def test_batch_partial_failure(mock_db, mock_ctx):
 @pytest.mark.asyncio
 async def test_batch_all_fail(mock_db, mock_ctx):
     """When all changes fail, status should be 'error'."""
+    mock_db.upsert_files_batch.side_effect = Exception("DB error")
     mock_db.upsert_file.side_effect = Exception("DB error")
 
     result = await update_graph(
@@ -547,3 +611,43 @@ async def test_batch_validation_errors_mixed_with_success(mock_db, mock_ctx):
     assert result["status"] == "partial"
     assert result["applied"] == 2
     assert len(result["errors"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_unhashable_fields_mixed_with_success(mock_db, mock_ctx):
+    """Non-string action/node_type values are per-change errors, not a crash."""
+    result = await update_graph(
+        codebase_name="my-repo",
+        changes=[
+            {"action": "upsert", "node_type": "File", "path": "src/a.py"},
+            {"action": ["upsert"], "node_type": "File", "path": "src/b.py"},
+            {"action": "upsert", "node_type": {"x": 1}, "path": "src/c.py"},
+            {"action": "upsert", "node_type": "File", "path": "src/d.py"},
+        ],
+        ctx=mock_ctx,
+    )
+    assert result["status"] == "partial"
+    assert result["applied"] == 2
+    assert result["errors"][0].startswith("Change 1: invalid action")
+    assert result["errors"][1].startswith("Change 2: invalid node_type")
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_are_capped(mock_db, mock_ctx):
+    """Large failing batches report error_count but only the first 50 messages."""
+    changes = [{"action": "invalid", "node_type": "File", "path": f"f{i}.py"}
+               for i in range(60)]
+
+    result = await update_graph(
+        codebase_name="my-repo", changes=changes, ctx=mock_ctx,
+    )
+    assert result["status"] == "error"
+    assert result["error_count"] == 60
+    assert len(result["errors"]) == 50
+    assert result["errors"][0].startswith("Change 0:")
+
+    result = await update_graph(
+        codebase_name="my-repo", changes=changes,
+        include_all_errors=True, ctx=mock_ctx,
+    )
+    assert len(result["errors"]) == 60
@@ -63,8 +63,9 @@ def main(argv: list[str] | None = None) -> None:
 
     with Neo4jStore(args.neo4j_uri, args.neo4j_user, args.neo4j_password, args.neo4j_database) as store:
         if args.clear:
-            print(f"Clearing existing data for codebase '{result.codebase.name}' ...")
-            store.clear(result.codebase.name)
-
-        store.save(result)
+            # The old data is removed in the same transaction as the write.
+            print(f"Replacing existing data for codebase '{result.codebase.name}' ...")
+        else:
+            print("Writing graph to Neo4j ...")
+        store.save(result, clear=args.clear)
         print("Done — graph written to Neo4j.")
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import ast
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
@@ -124,11 +125,12 @@ def _resolve_call_name(node: ast.Call) -> Optional[str]:
     return None
 
 
-def _parse_single_file(abs_path: Path, rel_path: str) -> Optional[_AstVisitor]:
+def _parse_single_file(abs_path: str, rel_path: str) -> Optional[_AstVisitor]:
     """Parse a single Python file and return a populated visitor, or None on failure."""
     try:
-        source = abs_path.read_text(encoding="utf-8", errors="replace")
-        tree = ast.parse(source, filename=str(abs_path))
+        with open(abs_path, encoding="utf-8", errors="replace") as fh:
+            source = fh.read()
+        tree = ast.parse(source, filename=abs_path)
     except SyntaxError:
         return None
 
@@ -152,10 +154,12 @@ def analyze_python_files(
     # Per-file data keyed by relative path
     visitors: Dict[str, _AstVisitor] = {}
 
-    # Phase 1: Parse each file
+    # Phase 1: Parse each file. File.path is already relative to root and
+    # the walk has stat()ed it, so open it by plain string path rather than
+    # building (and re-resolving) a Path per file.
+    root_str = str(root)
     for f in files:
-        abs_path = root / f.path
-        visitor = _parse_single_file(abs_path, f.path)
+        visitor = _parse_single_file(os.path.join(root_str, f.path), f.path)
         if visitor is None:
             continue
         visitors[f.path] = visitor
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import fnmatch
+import os
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -48,6 +50,27 @@ def _is_ignored(rel_path: str, patterns: list[str]) -> bool:
     return False
 
 
+def _scandir_recursive(
+    path: str, rel: str, ignore: set[str]
+) -> Iterator[tuple[os.DirEntry[str], str]]:
+    """Yield ``(entry, relative_path)`` for everything below *path*.
+
+    Depth-first with entries sorted by name, which is the same order as
+    ``sorted(root.rglob("*"))``. Entries named in *ignore* are skipped along
+    with their contents. Symlinked directories are yielded but not descended
+    into, as with rglob.
+    """
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if entry.name in ignore:
+            continue
+        rel_path = os.path.join(rel, entry.name) if rel else entry.name
+        yield entry, rel_path
+        if entry.is_dir(follow_symlinks=False):
+            yield from _scandir_recursive(entry.path, rel_path, ignore)
+
+
 @dataclass
 class Edge:
     """A directed relationship between two nodes."""
@@ -89,33 +112,26 @@ def index_repository(
 
     result = IndexResult(codebase=Codebase.from_path(root))
 
-    for item in sorted(root.rglob("*")):
-        # Skip anything whose path contains an ignored directory name.
-        if any(part in ignore for part in item.parts):
-            continue
-
-        rel_path = str(item.relative_to(root))
+    # os.scandir() reports file types from the directory listing itself, so
+    # classifying an entry needs no extra stat() call.
+    for entry, rel_path in _scandir_recursive(str(root), "", ignore):
         if _is_ignored(rel_path, indexignore_patterns):
             continue
 
-        if item.is_dir():
-            directory = Directory.from_path(item, root)
-            result.directories.append(directory)
+        source = os.path.dirname(rel_path) or root.name
 
-            parent_path = str(item.parent.relative_to(root)) if item.parent != root else ""
-            source = parent_path if parent_path else root.name
+        if entry.is_dir():
+            directory = Directory.from_entry(entry, rel_path)
+            result.directories.append(directory)
             result.edges.append(Edge(
                 source_path=source,
                 target_path=directory.path,
                 rel_type="CONTAINS_DIR",
             ))
 
-        elif item.is_file():
-            file_node = File.from_path(item, root)
+        elif entry.is_file():
+            file_node = File.from_entry(entry, rel_path)
             result.files.append(file_node)
-
-            parent_path = str(item.parent.relative_to(root)) if item.parent != root else ""
-            source = parent_path if parent_path else root.name
             result.edges.append(Edge(
                 source_path=source,
                 target_path=file_node.path,
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass, field
-from pathlib import Path
+from pathlib import Path, PurePath
 
 
 @dataclass
@@ -37,6 +38,14 @@ class Directory:
             depth=len(rel.parts),
         )
 
+    @staticmethod
+    def from_entry(entry: os.DirEntry[str], rel_path: str) -> Directory:
+        return Directory(
+            name=entry.name,
+            path=rel_path,
+            depth=rel_path.count(os.sep) + 1,
+        )
+
 
 @dataclass
 class File:
@@ -59,3 +68,14 @@ class File:
             extension=path.suffix,
             size_bytes=stat.st_size,
         )
+
+    @staticmethod
+    def from_entry(entry: os.DirEntry[str], rel_path: str) -> File:
+        # DirEntry.stat() is cached on the entry, so no extra syscall
+        # beyond the one the walk may already have made.
+        return File(
+            name=entry.name,
+            path=rel_path,
+            extension=PurePath(entry.name).suffix,
+            size_bytes=entry.stat().st_size,
+        )
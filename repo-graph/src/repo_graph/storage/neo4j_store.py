@@ -4,6 +4,71 @@ from neo4j import GraphDatabase
 
 from repo_graph.indexer.filesystem import IndexResult
 
+# Rows per UNWIND statement; bounds the size of any single query's parameters.
+UNWIND_BATCH_SIZE = 10_000
+
+# One UNWIND statement per kind of edge. Rows are grouped under these keys by
+# Neo4jStore._create_graph.
+_EDGE_CYPHER: dict[str, str] = {
+    "codebase_CONTAINS_DIR": (
+        "UNWIND $rows AS r "
+        "MATCH (c:Codebase {name: $codebase}) "
+        "MATCH (d:Directory {path: r.target, codebase: $codebase}) "
+        "MERGE (c)-[:CONTAINS_DIR]->(d)"
+    ),
+    "codebase_CONTAINS_FILE": (
+        "UNWIND $rows AS r "
+        "MATCH (c:Codebase {name: $codebase}) "
+        "MATCH (f:File {path: r.target, codebase: $codebase}) "
+        "MERGE (c)-[:CONTAINS_FILE]->(f)"
+    ),
+    "directory_CONTAINS_DIR": (
+        "UNWIND $rows AS r "
+        "MATCH (parent:Directory {path: r.source, codebase: $codebase}) "
+        "MATCH (child:Directory {path: r.target, codebase: $codebase}) "
+        "MERGE (parent)-[:CONTAINS_DIR]->(child)"
+    ),
+    "directory_CONTAINS_FILE": (
+        "UNWIND $rows AS r "
+        "MATCH (d:Directory {path: r.source, codebase: $codebase}) "
+        "MATCH (f:File {path: r.target, codebase: $codebase}) "
+        "MERGE (d)-[:CONTAINS_FILE]->(f)"
+    ),
+    "DEFINES_FUNCTION": (
+        "UNWIND $rows AS r "
+        "MATCH (f:File {path: r.source, codebase: $codebase}) "
+        "MATCH (fn:Function {file_path: r.source, name: r.target, codebase: $codebase}) "
+        "WHERE fn.is_method = false "
+        "MERGE (f)-[:DEFINES_FUNCTION]->(fn)"
+    ),
+    "DEFINES_CLASS": (
+        "UNWIND $rows AS r "
+        "MATCH (f:File {path: r.source, codebase: $codebase}) "
+        "MATCH (cl:Class {file_path: r.source, name: r.target, codebase: $codebase}) "
+        "MERGE (f)-[:DEFINES_CLASS]->(cl)"
+    ),
+    "HAS_METHOD": (
+        "UNWIND $rows AS r "
+        "MATCH (cl:Class {file_path: r.file_path, name: r.class_name, codebase: $codebase}) "
+        "MATCH (fn:Function {file_path: r.file_path, name: r.method_name, codebase: $codebase, "
+        "       owner_class: r.class_name}) "
+        "MERGE (cl)-[:HAS_METHOD]->(fn)"
+    ),
+    "CALLS_method": (
+        "UNWIND $rows AS r "
+        "MATCH (caller:Function {file_path: r.caller_file, name: r.caller_name, "
+        "       owner_class: r.caller_class, codebase: $codebase}) "
+        "MATCH (callee:Function {file_path: r.callee_file, name: r.callee_name, codebase: $codebase}) "
+        "MERGE (caller)-[:CALLS]->(callee)"
+    ),
+    "CALLS": (
+        "UNWIND $rows AS r "
+        "MATCH (caller:Function {file_path: r.caller_file, name: r.caller_name, codebase: $codebase}) "
+        "MATCH (callee:Function {file_path: r.callee_file, name: r.callee_name, codebase: $codebase}) "
+        "MERGE (caller)-[:CALLS]->(callee)"
+    ),
+}
+
 
 class Neo4jStore:
     """Persist an IndexResult into Neo4j."""
@@ -25,27 +90,48 @@ class Neo4jStore:
     # Public
     # ------------------------------------------------------------------
 
-    def save(self, result: IndexResult) -> None:
-        """Write the full index result as a single transaction."""
+    def save(self, result: IndexResult, clear: bool = False) -> None:
+        """Write the full index result as a single transaction.
+
+        Nodes and edges are sent as UNWIND batches, one statement per node
+        label / edge kind, instead of one statement per entity. With
+        *clear*, the codebase's existing nodes are removed first in the same
+        transaction, so readers never see it half-written or missing.
+        """
         with self._driver.session(database=self._database) as session:
-            session.execute_write(self._create_graph, result)
+            session.execute_write(self._replace_graph if clear else self._create_graph, result)
 
     def clear(self, codebase_name: str) -> None:
         """Remove all nodes belonging to a codebase."""
-        cypher = (
-            "MATCH (c:Codebase {name: $name}) "
-            "OPTIONAL MATCH (c)-[*]->(n) "
-            "DETACH DELETE c, n"
-        )
         with self._driver.session(database=self._database) as session:
-            session.run(cypher, name=codebase_name)
+            session.execute_write(self._clear_graph, codebase_name)
 
     # ------------------------------------------------------------------
     # Internals
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _create_graph(tx, result: IndexResult) -> None:
+    def _clear_graph(tx, codebase_name: str) -> None:
+        tx.run(
+            "MATCH (c:Codebase {name: $name}) "
+            "OPTIONAL MATCH (c)-[*]->(n) "
+            "DETACH DELETE c, n",
+            name=codebase_name,
+        )
+
+    @classmethod
+    def _replace_graph(cls, tx, result: IndexResult) -> None:
+        cls._clear_graph(tx, result.codebase.name)
+        cls._create_graph(tx, result)
+
+    @staticmethod
+    def _unwind(tx, cypher: str, rows: list[dict], **params) -> None:
+        """Run an ``UNWIND $rows AS r ...`` statement over *rows* in chunks."""
+        for start in range(0, len(rows), UNWIND_BATCH_SIZE):
+            tx.run(cypher, rows=rows[start:start + UNWIND_BATCH_SIZE], **params)
+
+    @classmethod
+    def _create_graph(cls, tx, result: IndexResult) -> None:
         cb = result.codebase
 
         # Codebase node
@@ -57,160 +143,109 @@ class Neo4jStore:
         )
 
         # Directory nodes
-        for d in result.directories:
-            tx.run(
-                "MERGE (d:Directory {path: $path, codebase: $codebase}) "
-                "SET d.name = $name, d.depth = $depth",
-                path=d.path,
-                codebase=cb.name,
-                name=d.name,
-                depth=d.depth,
-            )
+        cls._unwind(
+            tx,
+            "UNWIND $rows AS r "
+            "MERGE (d:Directory {path: r.path, codebase: $codebase}) "
+            "SET d.name = r.name, d.depth = r.depth",
+            [{"path": d.path, "name": d.name, "depth": d.depth} for d in result.directories],
+            codebase=cb.name,
+        )
 
         # File nodes
-        for f in result.files:
-            tx.run(
-                "MERGE (f:File {path: $path, codebase: $codebase}) "
-                "SET f.name = $name, f.extension = $extension, "
-                "    f.size_bytes = $size_bytes",
-                path=f.path,
-                codebase=cb.name,
-                name=f.name,
-                extension=f.extension,
-                size_bytes=f.size_bytes,
-            )
+        cls._unwind(
+            tx,
+            "UNWIND $rows AS r "
+            "MERGE (f:File {path: r.path, codebase: $codebase}) "
+            "SET f.name = r.name, f.extension = r.extension, "
+            "    f.size_bytes = r.size_bytes",
+            [
+                {"path": f.path, "name": f.name, "extension": f.extension, "size_bytes": f.size_bytes}
+                for f in result.files
+            ],
+            codebase=cb.name,
+        )
 
         # Function nodes
-        for func in result.functions:
-            tx.run(
-                "MERGE (fn:Function {file_path: $file_path, name: $name, "
-                "       line_number: $line_number, codebase: $codebase}) "
-                "SET fn.is_method = $is_method, fn.parameters = $params, "
-                "    fn.owner_class = $owner_class",
-                file_path=func.file_path,
-                name=func.name,
-                line_number=func.line_number,
-                codebase=cb.name,
-                is_method=func.is_method,
-                params=func.parameters,
-                owner_class=func.owner_class,
-            )
+        cls._unwind(
+            tx,
+            "UNWIND $rows AS r "
+            "MERGE (fn:Function {file_path: r.file_path, name: r.name, "
+            "       line_number: r.line_number, codebase: $codebase}) "
+            "SET fn.is_method = r.is_method, fn.parameters = r.params, "
+            "    fn.owner_class = r.owner_class",
+            [
+                {
+                    "file_path": func.file_path,
+                    "name": func.name,
+                    "line_number": func.line_number,
+                    "is_method": func.is_method,
+                    "params": func.parameters,
+                    "owner_class": func.owner_class,
+                }
+                for func in result.functions
+            ],
+            codebase=cb.name,
+        )
 
         # Class nodes
-        for cls in result.classes:
-            tx.run(
-                "MERGE (cl:Class {file_path: $file_path, name: $name, codebase: $codebase}) "
-                "SET cl.line_number = $line_number, cl.base_classes = $base_classes",
-                file_path=cls.file_path,
-                name=cls.name,
-                codebase=cb.name,
-                line_number=cls.line_number,
-                base_classes=cls.base_classes,
-            )
-
-        # Edges
+        cls._unwind(
+            tx,
+            "UNWIND $rows AS r "
+            "MERGE (cl:Class {file_path: r.file_path, name: r.name, codebase: $codebase}) "
+            "SET cl.line_number = r.line_number, cl.base_classes = r.base_classes",
+            [
+                {
+                    "file_path": c.file_path,
+                    "name": c.name,
+                    "line_number": c.line_number,
+                    "base_classes": c.base_classes,
+                }
+                for c in result.classes
+            ],
+            codebase=cb.name,
+        )
+
+        # Edges, grouped by the statement that creates them
+        edge_rows: dict[str, list[dict]] = {key: [] for key in _EDGE_CYPHER}
         for edge in result.edges:
             rel = edge.rel_type
 
             # -- File-system edges -----------------------------------------
             if rel in ("CONTAINS_DIR", "CONTAINS_FILE"):
-                if edge.source_path == cb.name:
-                    if rel == "CONTAINS_DIR":
-                        tx.run(
-                            "MATCH (c:Codebase {name: $codebase}) "
-                            "MATCH (d:Directory {path: $target, codebase: $codebase}) "
-                            "MERGE (c)-[:CONTAINS_DIR]->(d)",
-                            codebase=cb.name,
-                            target=edge.target_path,
-                        )
-                    else:
-                        tx.run(
-                            "MATCH (c:Codebase {name: $codebase}) "
-                            "MATCH (f:File {path: $target, codebase: $codebase}) "
-                            "MERGE (c)-[:CONTAINS_FILE]->(f)",
-                            codebase=cb.name,
-                            target=edge.target_path,
-                        )
-                else:
-                    if rel == "CONTAINS_DIR":
-                        tx.run(
-                            "MATCH (parent:Directory {path: $source, codebase: $codebase}) "
-                            "MATCH (child:Directory {path: $target, codebase: $codebase}) "
-                            "MERGE (parent)-[:CONTAINS_DIR]->(child)",
-                            codebase=cb.name,
-                            source=edge.source_path,
-                            target=edge.target_path,
-                        )
-                    else:
-                        tx.run(
-                            "MATCH (d:Directory {path: $source, codebase: $codebase}) "
-                            "MATCH (f:File {path: $target, codebase: $codebase}) "
-                            "MERGE (d)-[:CONTAINS_FILE]->(f)",
-                            codebase=cb.name,
-                            source=edge.source_path,
-                            target=edge.target_path,
-                        )
-
-            # -- AST edges -------------------------------------------------
-            elif rel == "DEFINES_FUNCTION":
-                tx.run(
-                    "MATCH (f:File {path: $source, codebase: $codebase}) "
-                    "MATCH (fn:Function {file_path: $source, name: $target, codebase: $codebase}) "
-                    "WHERE fn.is_method = false "
-                    "MERGE (f)-[:DEFINES_FUNCTION]->(fn)",
-                    codebase=cb.name,
-                    source=edge.source_path,
-                    target=edge.target_path,
+                scope = "codebase" if edge.source_path == cb.name else "directory"
+                edge_rows[f"{scope}_{rel}"].append(
+                    {"source": edge.source_path, "target": edge.target_path}
                 )
 
-            elif rel == "DEFINES_CLASS":
-                tx.run(
-                    "MATCH (f:File {path: $source, codebase: $codebase}) "
-                    "MATCH (cl:Class {file_path: $source, name: $target, codebase: $codebase}) "
-                    "MERGE (f)-[:DEFINES_CLASS]->(cl)",
-                    codebase=cb.name,
-                    source=edge.source_path,
-                    target=edge.target_path,
-                )
+            # -- AST edges -------------------------------------------------
+            elif rel in ("DEFINES_FUNCTION", "DEFINES_CLASS"):
+                edge_rows[rel].append({"source": edge.source_path, "target": edge.target_path})
 
             elif rel == "HAS_METHOD":
-                tx.run(
-                    "MATCH (cl:Class {file_path: $file_path, name: $class_name, codebase: $codebase}) "
-                    "MATCH (fn:Function {file_path: $file_path, name: $method_name, codebase: $codebase, "
-                    "       owner_class: $class_name}) "
-                    "MERGE (cl)-[:HAS_METHOD]->(fn)",
-                    codebase=cb.name,
-                    file_path=edge.source_path,
-                    class_name=edge.source_label,
-                    method_name=edge.target_path,
+                edge_rows[rel].append(
+                    {
+                        "file_path": edge.source_path,
+                        "class_name": edge.source_label,
+                        "method_name": edge.target_path,
+                    }
                 )
 
             elif rel == "CALLS":
                 # source_label may be qualified ("ClassName.method") for methods
                 # but the Function node's name is just "method", so split it.
                 caller_label = edge.source_label
+                row = {
+                    "caller_file": edge.source_path,
+                    "callee_file": edge.target_path,
+                    "callee_name": edge.target_label,
+                }
                 if "." in caller_label:
-                    caller_class, caller_method = caller_label.rsplit(".", 1)
-                    tx.run(
-                        "MATCH (caller:Function {file_path: $caller_file, name: $caller_name, "
-                        "       owner_class: $caller_class, codebase: $codebase}) "
-                        "MATCH (callee:Function {file_path: $callee_file, name: $callee_name, codebase: $codebase}) "
-                        "MERGE (caller)-[:CALLS]->(callee)",
-                        codebase=cb.name,
-                        caller_file=edge.source_path,
-                        caller_name=caller_method,
-                        caller_class=caller_class,
-                        callee_file=edge.target_path,
-                        callee_name=edge.target_label,
-                    )
+                    row["caller_class"], row["caller_name"] = caller_label.rsplit(".", 1)
+                    edge_rows["CALLS_method"].append(row)
                 else:
-                    tx.run(
-                        "MATCH (caller:Function {file_path: $caller_file, name: $caller_name, codebase: $codebase}) "
-                        "MATCH (callee:Function {file_path: $callee_file, name: $callee_name, codebase: $codebase}) "
-                        "MERGE (caller)-[:CALLS]->(callee)",
-                        codebase=cb.name,
-                        caller_file=edge.source_path,
-                        caller_name=caller_label,
-                        callee_file=edge.target_path,
-                        callee_name=edge.target_label,
-                    )
+                    row["caller_name"] = caller_label
+                    edge_rows["CALLS"].append(row)
+
+        for key, cypher in _EDGE_CYPHER.items():
+            cls._unwind(tx, cypher, edge_rows[key], codebase=cb.name)
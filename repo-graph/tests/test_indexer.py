@@ -74,6 +74,20 @@ def test_nested_directories(tmp_path: Path) -> None:
     assert depths["c"] == 3
 
 
+def test_walk_order_matches_sorted_paths(tmp_path: Path) -> None:
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "x.py").write_text("")
+    (tmp_path / "a.txt").write_text("")
+    (tmp_path / "z.py").write_text("")
+
+    result = index_repository(tmp_path)
+
+    assert [d.path for d in result.directories] == ["a", str(Path("a") / "b")]
+    assert [f.path for f in result.files] == [
+        str(Path("a") / "b" / "x.py"), "a.txt", "z.py",
+    ]
+
+
 # --- .indexignore tests ---
 
 
@@ -0,0 +1,102 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from repo_graph.indexer.filesystem import index_repository
+from repo_graph.storage import neo4j_store
+from repo_graph.storage.neo4j_store import _EDGE_CYPHER, Neo4jStore
+
+
+def _index_sample(tmp_path: Path):
+    # root/
+    #   pkg/
+    #     mod.py   (helper(), class Greeter with greet() calling helper())
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text(
+        "def helper():\n"
+        "    return 1\n"
+        "\n"
+        "\n"
+        "class Greeter:\n"
+        "    def greet(self):\n"
+        "        return helper()\n"
+    )
+    return index_repository(tmp_path, analyze_python=True)
+
+
+def _edge_runs(tx: MagicMock) -> dict[str, list[dict]]:
+    """Map each _EDGE_CYPHER key that was run to the rows it was given."""
+    by_cypher = {cypher: key for key, cypher in _EDGE_CYPHER.items()}
+    runs: dict[str, list[dict]] = {}
+    for call in tx.run.call_args_list:
+        key = by_cypher.get(call.args[0])
+        if key is not None:
+            runs.setdefault(key, []).extend(call.kwargs["rows"])
+    return runs
+
+
+def test_replace_graph_clears_before_writing(tmp_path: Path) -> None:
+    result = _index_sample(tmp_path)
+    tx = MagicMock()
+
+    Neo4jStore._replace_graph(tx, result)
+
+    first, second = tx.run.call_args_list[:2]
+    assert "DETACH DELETE" in first.args[0]
+    assert first.kwargs == {"name": result.codebase.name}
+    assert second.args[0].startswith("MERGE (c:Codebase")
+    assert all("DETACH DELETE" not in c.args[0] for c in tx.run.call_args_list[1:])
+
+
+def test_create_graph_groups_edges_by_statement(tmp_path: Path) -> None:
+    result = _index_sample(tmp_path)
+    tx = MagicMock()
+
+    Neo4jStore._create_graph(tx, result)
+
+    runs = _edge_runs(tx)
+    cb = result.codebase.name
+    assert runs == {
+        "codebase_CONTAINS_DIR": [{"source": cb, "target": "pkg"}],
+        "directory_CONTAINS_FILE": [{"source": "pkg", "target": "pkg/mod.py"}],
+        "DEFINES_FUNCTION": [{"source": "pkg/mod.py", "target": "helper"}],
+        "DEFINES_CLASS": [{"source": "pkg/mod.py", "target": "Greeter"}],
+        "HAS_METHOD": [
+            {"file_path": "pkg/mod.py", "class_name": "Greeter", "method_name": "greet"},
+        ],
+        "CALLS_method": [
+            {
+                "caller_file": "pkg/mod.py",
+                "callee_file": "pkg/mod.py",
+                "callee_name": "helper",
+                "caller_class": "Greeter",
+                "caller_name": "greet",
+            },
+        ],
+    }
+    # Edge kinds without rows are not sent at all.
+    assert "CALLS" not in runs
+    assert all(c.kwargs.get("codebase", cb) == cb for c in tx.run.call_args_list)
+
+
+def test_unwind_splits_rows_into_batches() -> None:
+    tx = MagicMock()
+    rows = [{"i": i} for i in range(5)]
+
+    with patch.object(neo4j_store, "UNWIND_BATCH_SIZE", 2):
+        Neo4jStore._unwind(tx, "UNWIND $rows AS r RETURN r", rows, codebase="cb")
+
+    assert [c.kwargs["rows"] for c in tx.run.call_args_list] == [rows[0:2], rows[2:4], rows[4:5]]
+
+
+def test_save_uses_one_transaction(tmp_path: Path) -> None:
+    result = _index_sample(tmp_path)
+    with patch.object(neo4j_store, "GraphDatabase") as graph_db:
+        session = graph_db.driver.return_value.session.return_value.__enter__.return_value
+        with Neo4jStore("bolt://localhost:7687", "neo4j", "password") as store:
+            store.save(result, clear=True)
+            store.save(result)
+
+    assert [c.args for c in session.execute_write.call_args_list] == [
+        (Neo4jStore._replace_graph, result),
+        (Neo4jStore._create_graph, result),
+    ]